@@ -0,0 +1,7 @@
+"""Scaling benchmarks for the dashboard's data and rendering paths.
+
+    python -m benchmarks.run --districts 150 300 600 --years 9
+
+Data comes from ``benchmarks.synthetic``, which writes CSVs shaped like
+final_merged_assess_demo_df.csv.
+"""
@@ -0,0 +1,119 @@
+"""Measure the dashboard's cold start in a fresh Python process.
+
+Each run starts a new interpreter so nothing is imported or cached yet, then
+reports
+
+- imports: importing what the app script imports,
+- deferred: whether matplotlib/altair were already imported at that point
+  (they should not be; see render.load_matplotlib and the app's Interactive branch),
+- first paint: time from the start of the first script run until the
+  sidebar and page title have been sent,
+- first run: the whole first script run, including the first chart,
+- warm-up: the background warm-up of loaders.start_warmup.
+
+With ``--prewarm`` the warm-up is started and awaited before the first
+session, as serve.py does at server start, so "first run" shows what the
+first reader sees once the server has warmed. Run it where
+final_merged_assess_demo_df.csv is (or with PPS_DSG_BUNDLE / PPS_DSG_STORE
+set):
+
+    python -m benchmarks.coldstart [--runs 3] [--prewarm] [--output coldstart.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+APP_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                          "pps_dsg_streamlit_20jun25.py")
+
+DEFERRED_MODULES = ('matplotlib', 'altair')
+
+# Runs in the fresh interpreter; prints one JSON line
+_CHILD = """
+import json, sys, time
+start = time.perf_counter()
+import streamlit, pandas
+from pps_dsg import loaders, metrics, render, timing, trends, views
+imports = time.perf_counter() - start
+deferred = {name: name not in sys.modules for name in DEFERRED_MODULES}
+prewarm = None
+if PREWARM:
+    start = time.perf_counter()
+    loaders.start_warmup().join()
+    prewarm = time.perf_counter() - start
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(APP_SCRIPT, default_timeout=TIMEOUT)
+start = time.perf_counter()
+at.run()
+first_run = time.perf_counter() - start
+loaders.start_warmup().join()
+print(json.dumps({
+    'imports': imports,
+    'deferred': deferred,
+    'prewarm': prewarm,
+    'first_paint': timing.STARTUP.get('first paint'),
+    'first_run': first_run,
+    'warm_up': timing.STARTUP.get('warm-up'),
+    'import_matplotlib': timing.STARTUP.get('import matplotlib'),
+    'errors': [str(e.value) for e in at.exception],
+}))
+"""
+
+
+def run_once(prewarm=False, timeout=120):
+    """One cold start in a child interpreter; returns its measurements (seconds)"""
+    code = (f"APP_SCRIPT = {APP_SCRIPT!r}\nDEFERRED_MODULES = {DEFERRED_MODULES!r}\n"
+            f"PREWARM = {bool(prewarm)!r}\nTIMEOUT = {timeout!r}\n{_CHILD}")
+    env = dict(os.environ)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [root, env.get('PYTHONPATH')]))
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, env=env, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def summarize(runs, key):
+    samples = [run[key] for run in runs if run[key] is not None]
+    if not samples:
+        return None
+    return {'median_ms': statistics.median(samples) * 1000, 'max_ms': max(samples) * 1000}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the dashboard's import, first-paint and warm-up times")
+    parser.add_argument('--runs', type=int, default=3, help="fresh processes to start")
+    parser.add_argument('--prewarm', action='store_true', help="warm the caches before the first session")
+    parser.add_argument('--timeout', type=float, default=120, help="seconds allowed for the first run")
+    parser.add_argument('--output', help="JSON file to write the report to")
+    args = parser.parse_args(argv)
+
+    runs = [run_once(args.prewarm, args.timeout) for _ in range(args.runs)]
+    report = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'runs': len(runs),
+        'prewarm': args.prewarm,
+        'mode': 'store' if os.environ.get('PPS_DSG_STORE') else 'bundle' if os.environ.get('PPS_DSG_BUNDLE') else 'csv',
+        'deferred': {name: all(run['deferred'][name] for run in runs) for name in DEFERRED_MODULES},
+        'errors': [error for run in runs for error in run['errors']],
+    }
+    for key in ('imports', 'first_paint', 'first_run', 'warm_up', 'import_matplotlib', 'prewarm'):
+        report[key] = summarize(runs, key)
+
+    print(f"{report['runs']} cold starts ({report['mode']} mode{', prewarmed' if args.prewarm else ''})")
+    for key in ('imports', 'first_paint', 'first_run', 'warm_up', 'import_matplotlib', 'prewarm'):
+        if report[key]:
+            print(f"  {key:<17} median {report[key]['median_ms']:7.1f} ms  max {report[key]['max_ms']:7.1f} ms")
+    print("  deferred imports: " + ', '.join(f"{name} {'yes' if ok else 'NO'}" for name, ok in report['deferred'].items()))
+    if report['errors']:
+        print(f"  {len(report['errors'])} runs raised, first: {report['errors'][0]}")
+    if args.output:
+        with open(args.output, 'w') as fh:
+            json.dump(report, fh, indent=2)
+        print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
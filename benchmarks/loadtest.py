@@ -0,0 +1,156 @@
+"""Simulate concurrent dashboard sessions with Streamlit's AppTest.
+
+Each session is an AppTest of the app script running in its own thread, so
+all sessions share the process's st.cache_resource objects the way the
+sessions of one server do. A session opens the app and then clicks through
+random pages, years and subjects; every click is one script rerun, timed
+from the widget change until the rerun finishes.
+
+Reports p50/p95/max rerun latency over all clicks (and separately the first
+run of each session) plus the peak RSS of the process. The app reads its
+data from the working directory as usual, so run this where
+final_merged_assess_demo_df.csv is (or with PPS_DSG_BUNDLE / PPS_DSG_STORE
+set):
+
+    python -m benchmarks.loadtest --sessions 8 --clicks 25 [--output loadtest.json]
+"""
+import argparse
+import json
+import math
+import os
+import random
+import resource
+import statistics
+import sys
+import threading
+import time
+
+from streamlit.testing.v1 import AppTest
+
+from pps_dsg import metrics
+
+APP_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                          "pps_dsg_streamlit_20jun25.py")
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MiB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def percentile(samples, q):
+    """Nearest-rank percentile of ``samples`` (q in 0..100)"""
+    ordered = sorted(samples)
+    rank = max(math.ceil(q / 100 * len(ordered)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def _widget(widgets, label):
+    for widget in widgets:
+        if widget.label == label:
+            return widget
+    return None
+
+
+def _click(at, rng):
+    """Change one widget the way a reader would; returns a label for the click"""
+    choice = rng.random()
+    year = _widget(at.radio, "Select Year")
+    subject = _widget(at.selectbox, "Select Subject")
+    if choice < 0.3 or year is None:
+        page = rng.choice(list(metrics.PAGES))
+        at.sidebar.selectbox[0].select(page)
+        return f"page:{page}"
+    if subject is not None and choice < 0.5:
+        subject.select_index(rng.randrange(len(subject.options)))
+        return "subject"
+    year.set_value(rng.choice(year.options))
+    return "year"
+
+
+def run_session(n, clicks, seed, timeout, results):
+    """One simulated reader; appends its timings to ``results``"""
+    rng = random.Random(seed)
+    at = AppTest.from_file(APP_SCRIPT, default_timeout=timeout)
+    session = {'session': n, 'first_run': None, 'clicks': [], 'errors': []}
+    start = time.perf_counter()
+    at.run()
+    session['first_run'] = time.perf_counter() - start
+    for _ in range(clicks):
+        label = _click(at, rng)
+        start = time.perf_counter()
+        at.run()
+        session['clicks'].append((label, time.perf_counter() - start))
+        if at.exception:
+            session['errors'].append(str(at.exception[0].value))
+    results.append(session)
+
+
+def summarize(samples):
+    return {
+        'count': len(samples),
+        'p50_ms': percentile(samples, 50) * 1000,
+        'p95_ms': percentile(samples, 95) * 1000,
+        'max_ms': max(samples) * 1000,
+        'mean_ms': statistics.fmean(samples) * 1000,
+    }
+
+
+def load_test(sessions=8, clicks=25, seed=0, timeout=120):
+    """Run ``sessions`` concurrent sessions of ``clicks`` reruns each; returns the report dict"""
+    results = []
+    threads = [
+        threading.Thread(target=run_session, args=(n, clicks, seed + n, timeout, results))
+        for n in range(sessions)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+
+    click_times = [seconds for session in results for _, seconds in session['clicks']]
+    return {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'sessions': sessions,
+        'clicks_per_session': clicks,
+        'mode': 'store' if os.environ.get('PPS_DSG_STORE') else 'bundle' if os.environ.get('PPS_DSG_BUNDLE') else 'csv',
+        'wall_seconds': wall,
+        'reruns_per_second': len(click_times) / wall if wall else None,
+        'first_run': summarize([session['first_run'] for session in results]),
+        'rerun': summarize(click_times),
+        'peak_rss_mb': peak_rss_mb(),
+        'errors': [error for session in results for error in session['errors']],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the dashboard with concurrent AppTest sessions")
+    parser.add_argument('--sessions', type=int, default=8, help="concurrent sessions")
+    parser.add_argument('--clicks', type=int, default=25, help="widget changes per session")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--timeout', type=float, default=120, help="seconds allowed per rerun")
+    parser.add_argument('--output', help="JSON file to write the report to")
+    args = parser.parse_args(argv)
+
+    report = load_test(args.sessions, args.clicks, args.seed, args.timeout)
+    print(f"{report['sessions']} sessions x {report['clicks_per_session']} clicks ({report['mode']} mode) "
+          f"in {report['wall_seconds']:.1f}s")
+    for name in ('first_run', 'rerun'):
+        stats = report[name]
+        print(f"  {name:<9} p50 {stats['p50_ms']:7.1f} ms  p95 {stats['p95_ms']:7.1f} ms  "
+              f"max {stats['max_ms']:7.1f} ms  (n={stats['count']})")
+    print(f"  peak RSS {report['peak_rss_mb']:.0f} MiB")
+    if report['errors']:
+        print(f"  {len(report['errors'])} reruns raised, first: {report['errors'][0]}")
+    if args.output:
+        with open(args.output, 'w') as fh:
+            json.dump(report, fh, indent=2)
+        print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
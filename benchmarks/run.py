@@ -0,0 +1,152 @@
+"""Time the dashboard's compute and render paths on synthetic data.
+
+For each requested scale a synthetic CSV is written to a temporary
+directory and the following are timed separately:
+
+- ingest: CSV parse, cold cache build, warm Dataset open, index builds
+- ranks: the district rank table and one focal-district lookup
+- cube: the statewide summary cube and one trend read from it
+- peers: the per-year peer index, one neighbour query and the peer group's ranks and cube
+- page.<page>: each page's compute path (views.year_views for its metrics)
+- comparison_table.<metric>: the district vs State table (bootstrap intervals,
+  views.comparison_rows and format_comparison)
+- render.<page>: drawing the page's figure and encoding it as PNG
+
+Results go to a JSON file so runs can be compared over time.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import tempfile
+import time
+
+import matplotlib
+import pandas as pd
+
+from benchmarks import synthetic
+from pps_dsg import bootstrap, cube, ingest, metrics, peers, ranks, render, views
+from pps_dsg.dataset import Dataset, achievement_index, metric_index
+
+
+def timed(fn, repeat):
+    """Run ``fn`` ``repeat`` times; return (last result, timing summary in seconds)"""
+    samples = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return result, {
+        'min': min(samples),
+        'median': statistics.median(samples),
+        'mean': statistics.fmean(samples),
+        'repeat': repeat,
+    }
+
+
+def _clear_cache(csv_path):
+    for path in ingest.cache_paths(csv_path):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def bench_scale(workdir, n_districts, n_years, n_populations, repeat):
+    """Timings for one synthetic dataset size"""
+    csv_path = os.path.join(workdir, f"synthetic_{n_districts}x{n_years}x{n_populations}.csv")
+    df = synthetic.generate(n_districts, n_years, n_populations)
+    df.to_csv(csv_path, index=False)
+
+    timings = {}
+    _, timings['ingest.parse_csv'] = timed(
+        lambda: ingest.parse_frame(pd.read_csv(csv_path, low_memory=False)), repeat)
+
+    def cold_build():
+        _clear_cache(csv_path)
+        return ingest.ensure_cache(csv_path)
+    _, timings['ingest.cache_build'] = timed(cold_build, repeat)
+    data, timings['dataset.open_warm'] = timed(lambda: Dataset.open(csv_path), repeat)
+
+    indexes = {}
+    indexes['rows'], timings['index.metrics'] = timed(lambda: metric_index(Dataset.open(csv_path)), repeat)
+    indexes['achievement'], timings['index.achievement'] = timed(lambda: achievement_index(data), repeat)
+
+    sources = [(indexes[source], metrics.metrics_for_source(source)) for source in ('rows', 'achievement')]
+    rank_frame, timings['ranks.build'] = timed(lambda: ranks.rank_frame(sources), repeat)
+    rank_table = ranks.RankTable(rank_frame)
+    cube_frame, timings['cube.build'] = timed(lambda: cube.build_cube(sources, rank_frame), repeat)
+    summary_cube = cube.SummaryCube(cube_frame)
+
+    years = synthetic.school_years(n_years)
+    year = years[-1]
+    _, timings['cube.trend'] = timed(
+        lambda: summary_cube.trend('chronic_absenteeism', 'All Students', years), repeat)
+    _, timings['ranks.lookup'] = timed(
+        lambda: rank_table.lookup('chronic_absenteeism', year, 'All Students', views.PORTLAND), repeat)
+    peer_index, timings['peers.index'] = timed(lambda: peers.PeerIndex(rank_frame, year), repeat)
+    neighbours, timings['peers.query'] = timed(lambda: peer_index.neighbours(views.PORTLAND), repeat)
+    group = [views.PORTLAND] + [district for district, _ in neighbours]
+    _, timings['peers.group'] = timed(lambda: peers.peer_frames(rank_frame, group), repeat)
+    for page in metrics.PAGES.values():
+        page_metrics = [metrics.METRICS[key] for key in page.metrics]
+        index = indexes[page_metrics[0].source]
+        page_views, timings[f'page.{page.name}'] = timed(
+            lambda: views.year_views(index, year, page_metrics), repeat)
+
+        def comparison_table(metric):
+            intervals = bootstrap.metric_year_intervals(rank_table, metric.key, year, views.SUMMARY_GROUPS)
+            rows = views.comparison_rows(summary_cube, rank_table, metric.key, year, [views.PORTLAND], intervals)
+            return views.format_comparison(rows, metric.formatter)
+
+        for metric in page_metrics:
+            _, timings[f'comparison_table.{metric.key}'] = timed(lambda: comparison_table(metric), repeat)
+
+        metric = page_metrics[0]
+        view = page_views[metric.key]
+        focal = [(views.PORTLAND, rank_table.markers(metric.key, year, view['populations'], views.PORTLAND))]
+        _, timings[f'render.{page.name}'] = timed(
+            lambda: render.encode_figure(render.draw_view(view, metric, year, focal)), repeat)
+
+    return {
+        'districts': n_districts,
+        'years': n_years,
+        'populations': n_populations,
+        'rows': len(df),
+        'csv_bytes': os.path.getsize(csv_path),
+        'timings': timings,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard on synthetic data")
+    parser.add_argument('--districts', type=int, nargs='+', default=[150, 300, 600])
+    parser.add_argument('--years', type=int, default=7)
+    parser.add_argument('--populations', type=int, default=5)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', default='bench_results.json', help="JSON file to write")
+    args = parser.parse_args(argv)
+    matplotlib.use('Agg')
+
+    results = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'pandas': pd.__version__,
+        'scales': [],
+    }
+    with tempfile.TemporaryDirectory() as workdir:
+        for n_districts in args.districts:
+            scale = bench_scale(workdir, n_districts, args.years, args.populations, args.repeat)
+            results['scales'].append(scale)
+            slowest = max(scale['timings'].items(), key=lambda item: item[1]['median'])
+            print(f"{n_districts} districts, {scale['rows']} rows: "
+                  f"slowest {slowest[0]} {slowest[1]['median'] * 1000:.1f} ms")
+
+    with open(args.output, 'w') as fh:
+        json.dump(results, fh, indent=2)
+    print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
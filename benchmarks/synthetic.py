@@ -0,0 +1,104 @@
+"""Synthetic data shaped like final_merged_assess_demo_df.csv.
+
+One row per (year, district, population, achievement level) with the same
+column names and text encodings as the Maine DOE warehouse merge: '12.3%'
+percentages, '14,665.52' amounts and '*' for suppressed cells. Every metric
+in the registry gets a column, with values drawn inside its plotted range.
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from pps_dsg import metrics
+from pps_dsg.views import PORTLAND
+
+ACHIEVEMENT_LEVELS = [
+    'Well Below State Expectations',
+    'Below State Expectations',
+    'At State Expectations',
+    'Above State Expectations',
+]
+
+POPULATIONS = [
+    "All Students",
+    "Economically Disadvantaged",
+    "Students with Disabilities",
+    "Female",
+    "Male",
+    "English Learners",
+    "Homeless",
+    "Military Connected",
+]
+
+
+def school_years(n_years, last=2024):
+    """['2015-2016', ...] ending with the school year that ends in ``last``"""
+    return [f"{end - 1}-{end}" for end in range(last - n_years + 1, last + 1)]
+
+
+def _encode(values, metric, suppressed):
+    if metric.parser is metrics.parse_amount:
+        text = np.array([f"{v:,.2f}" for v in values])
+    else:
+        text = np.char.mod('%.1f%%', values)
+    return np.where(suppressed, '*', text)
+
+
+def generate(n_districts=150, n_years=7, n_populations=5, suppressed=0.08, seed=0):
+    """Synthetic merged frame with Portland plus ``n_districts`` other districts"""
+    rng = np.random.default_rng(seed)
+    years = school_years(n_years)
+    districts = [PORTLAND] + [f"Synthetic District {i:04d}" for i in range(n_districts)]
+    populations = POPULATIONS[:n_populations] + [
+        f"Synthetic Population {i}" for i in range(n_populations - len(POPULATIONS))
+    ]
+
+    # One entity per (year, district, population); levels repeat its metrics
+    n_levels = len(ACHIEVEMENT_LEVELS)
+    year_idx, district_idx, pop_idx = np.meshgrid(
+        np.arange(len(years)), np.arange(len(districts)), np.arange(len(populations)), indexing='ij')
+    year_idx, district_idx, pop_idx = (a.ravel() for a in (year_idx, district_idx, pop_idx))
+    n_entities = len(year_idx)
+
+    df = pd.DataFrame({
+        'Year': np.repeat(np.array(years)[year_idx], n_levels),
+        'District Name': np.repeat(np.array(districts)[district_idx], n_levels),
+        'Population': np.repeat(np.array(populations)[pop_idx], n_levels),
+        'Achievement Level': np.tile(ACHIEVEMENT_LEVELS, n_entities),
+    })
+
+    for metric in metrics.metrics_for_source('rows'):
+        low, high = metric.xlim
+        center, spread = (low + high) / 2, (high - low) / 6
+        values = np.clip(rng.normal(center, spread, n_entities), low, high)
+        state = np.clip(rng.normal(center, spread / 4, (len(years), len(populations))), low, high)
+        hidden = rng.random(n_entities) < suppressed
+        df[metric.column] = np.repeat(_encode(values, metric, hidden), n_levels)
+        df[metric.statewide_column] = np.repeat(
+            _encode(state[year_idx, pop_idx], metric, np.zeros(n_entities, dtype=bool)), n_levels)
+
+    for subject in metrics.SUBJECTS:
+        # Level shares of each entity sum to 100
+        shares = rng.dirichlet(np.ones(n_levels), n_entities).ravel() * 100
+        hidden = rng.random(len(shares)) < suppressed
+        df[metrics.subject_column(subject)] = np.char.mod('%.1f%%', shares)
+        df.loc[hidden, metrics.subject_column(subject)] = '*'
+    return df
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a synthetic merged assessment/demographics CSV")
+    parser.add_argument('output', help="CSV path to write")
+    parser.add_argument('--districts', type=int, default=150)
+    parser.add_argument('--years', type=int, default=7)
+    parser.add_argument('--populations', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    df = generate(args.districts, args.years, args.populations, seed=args.seed)
+    df.to_csv(args.output, index=False)
+    print(f"Wrote {len(df)} rows to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
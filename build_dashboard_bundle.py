@@ -0,0 +1,11 @@
+"""Precompute every dashboard view into dashboard_bundle.pkl.
+
+    python build_dashboard_bundle.py [--data final_merged_assess_demo_df.csv] [--workers N]
+
+Start the app with PPS_DSG_BUNDLE=dashboard_bundle.pkl to serve from the
+bundle without loading the CSV.
+"""
+from pps_dsg.bundle import main
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,11 @@
+"""Build final_merged_assess_demo_df.csv from the raw warehouse exports.
+
+    python build_merged_dataset.py raw_exports/ [--output final_merged_assess_demo_df.csv]
+        [--spec spec.json] [--aliases aliases.json] [--partitions 16] [--chunksize 200000]
+
+See pps_dsg/build.py for the export layout it expects.
+"""
+from pps_dsg.build import main
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,12 @@
+"""Export every dashboard page, year and subject as a static HTML site.
+
+    python export_static_site.py [--output site] [--data final_merged_assess_demo_df.csv]
+        [--bundle dashboard_bundle.pkl | --store pps_dsg_store] [--district NAME ...] [--workers N]
+
+Serve the output directory with any static file server. Charts whose data
+has not changed since the last export are not redrawn.
+"""
+from pps_dsg.site import main
+
+if __name__ == "__main__":
+    main()
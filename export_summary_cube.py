@@ -0,0 +1,14 @@
+"""Export the statewide summary cube (every metric x year x population) for analysis.
+
+    python export_summary_cube.py [--output summary_cube.csv | summary_cube.parquet]
+        [--data final_merged_assess_demo_df.csv | --bundle dashboard_bundle.pkl | --store pps_dsg_store]
+        [--district NAME]
+
+One row per metric, year and population: the focal district's value, the
+statewide mean, the mean, median and quantiles of the district values, and
+the number of districts reporting and suppressed.
+"""
+from pps_dsg.cube import main
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,12 @@
+"""Add a school year's warehouse export to the year-partitioned store.
+
+    python ingest_year.py append export_2024-2025.csv [--store pps_dsg_store]
+    python ingest_year.py list
+    python ingest_year.py remove 2024-2025
+
+Start the app with PPS_DSG_STORE=pps_dsg_store to serve from the store.
+"""
+from pps_dsg.store import main
+
+if __name__ == "__main__":
+    main()
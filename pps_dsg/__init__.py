@@ -0,0 +1 @@
+"""Data layer for the PPS district performance dashboard."""
@@ -0,0 +1,68 @@
+"""Combined "At or Above State Expectations" percentages.
+
+The warehouse reports achievement as one row per level. A district's "At or
+Above" value for a subject is the sum of its 'At or Above', 'At' and 'Above'
+rows; suppressed ('*') or missing cells are skipped, and a district with no
+usable cell has no value at all. ``at_or_above_totals`` applies that rule to
+every year, population, district and subject in one groupby. A district
+whose total is missing because its cells were suppressed keeps a row, with
+its "(suppressed)" flag set, so summaries can count it.
+"""
+import numpy as np
+import pandas as pd
+
+from pps_dsg.index import KEY_COLUMNS
+from pps_dsg.ingest import SOURCE_ROW
+from pps_dsg.metrics import SUBJECTS, subject_column, suppressed_column, total_column
+
+# Order matters: pages colour populations by first appearance in these rows
+AT_OR_ABOVE_LEVELS = [
+    'At or Above State Expectations',
+    'At State Expectations',
+    'Above State Expectations',
+]
+
+
+def input_columns(subjects=SUBJECTS):
+    """Columns of the merged frame that at_or_above_totals reads"""
+    columns = [subject_column(s) for s in subjects]
+    return (list(KEY_COLUMNS) + ['Achievement Level', SOURCE_ROW] + columns
+            + [suppressed_column(c) for c in columns])
+
+
+def at_or_above_totals(df, subjects=SUBJECTS):
+    """One row per (Year, Population, District Name) with a combined column per subject"""
+    level_codes = pd.Categorical(df['Achievement Level'], categories=AT_OR_ABOVE_LEVELS).codes
+    rows = df[level_codes >= 0]
+    level_codes = level_codes[level_codes >= 0]
+
+    # Population order of the old concat(at_or_above, at, above) frame, i.e.
+    # by level, then by position in the source file (the rows are sorted by
+    # key since ingest)
+    position = rows[SOURCE_ROW].to_numpy() if SOURCE_ROW in rows.columns else np.arange(len(rows))
+    first_seen = np.lexsort((position, level_codes))
+    populations = pd.unique(rows['Population'].to_numpy()[first_seen])
+
+    subjects = [s for s in subjects if subject_column(s) in df.columns]
+    values = rows[[subject_column(s) for s in subjects]].astype('float64')
+    values.columns = [total_column(s) for s in subjects]
+    keys = [rows[key] for key in KEY_COLUMNS]
+    totals = values.groupby(keys, observed=True).sum(min_count=1)
+
+    flagged = [s for s in subjects if suppressed_column(subject_column(s)) in df.columns]
+    if flagged:
+        flags = rows[[suppressed_column(subject_column(s)) for s in flagged]]
+        flags.columns = [suppressed_column(total_column(s)) for s in flagged]
+        flags = flags.groupby(keys, observed=True).any()
+        for subject in flagged:
+            column = suppressed_column(total_column(subject))
+            flags[column] &= totals[total_column(subject)].isna()
+        totals = totals.join(flags)
+    totals = totals.reset_index()
+
+    totals['Population'] = pd.Categorical(totals['Population'].astype(object), categories=populations)
+    keep = totals[list(values.columns)].notna().any(axis=1)
+    if flagged:
+        keep |= totals[list(flags.columns)].any(axis=1)
+    totals = totals[keep]
+    return totals.sort_values(list(KEY_COLUMNS), kind='stable', ignore_index=True)
@@ -0,0 +1,69 @@
+"""Bootstrap intervals for the district-vs-State comparison.
+
+For one (metric, year, population) the sample is the value of every district
+(one per district, from the rank table). A single ``RESAMPLES`` x n matrix of
+resample indices gives both
+
+- a confidence interval for the mean district value, from the row means, and
+- a percentile band for every district at once: the share of each resample
+  at or below the district's value, read off a cumulative count of how often
+  each sorted position was drawn.
+
+No Python loop runs over resamples or districts.
+"""
+import numpy as np
+
+RESAMPLES = 1000
+
+# Central coverage of the intervals, in percent
+LEVEL = 95
+
+SEED = 0
+
+
+def group_intervals(values, resamples=RESAMPLES, level=LEVEL, rng=None):
+    """Bootstrap intervals of one group of district values
+
+    Returns ``(mean_interval, bands)``: ``mean_interval`` is (low, high) for
+    the mean, ``bands`` a (len(values), 2) array of percentile bands in the
+    order of ``values``. Both are None for fewer than two values.
+    """
+    values = np.asarray(values, dtype='float64')
+    n = len(values)
+    if n < 2:
+        return None, None
+    rng = rng or np.random.default_rng(SEED)
+    order = np.argsort(values, kind='stable')
+    ordered = values[order]
+    draws = rng.integers(0, n, size=(resamples, n))
+    tails = [(100 - level) / 2, 100 - (100 - level) / 2]
+
+    means = ordered[draws].mean(axis=1)
+    mean_interval = tuple(float(v) for v in np.percentile(means, tails))
+
+    # counts[b, i]: how often sorted position i was drawn in resample b
+    offsets = np.arange(resamples)[:, None] * n
+    counts = np.bincount((draws + offsets).ravel(), minlength=resamples * n).reshape(resamples, n)
+    at_or_below = np.cumsum(counts, axis=1) * (100.0 / n)
+    # Ties share the last sorted position of their value
+    position = np.searchsorted(ordered, values, side='right') - 1
+    bands = np.percentile(at_or_below, tails, axis=0).T[position]
+    return mean_interval, bands
+
+
+def metric_year_intervals(rank_table, metric_key, year, populations, resamples=RESAMPLES, level=LEVEL, seed=SEED):
+    """{population: {'mean': (low, high) | None, 'bands': {district: (low, high)}}}
+
+    The point estimates themselves (mean district value, percentiles) are in
+    the summary cube and the rank table.
+    """
+    rng = np.random.default_rng(seed)
+    result = {}
+    for pop in populations:
+        districts, values = rank_table.group(metric_key, year, pop)
+        mean_interval, bands = group_intervals(values, resamples, level, rng)
+        result[pop] = {
+            'mean': mean_interval,
+            'bands': {} if bands is None else {d: (float(lo), float(hi)) for d, (lo, hi) in zip(districts, bands)},
+        }
+    return result
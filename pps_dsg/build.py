@@ -0,0 +1,314 @@
+"""Build the merged assessment/demographics dataset from raw warehouse exports.
+
+The dashboard reads one merged file with a row per (year, district,
+population, achievement level) and wide ``Percentage of Students at
+Achievement Level_{subject}`` columns. ``build_merged`` produces it from the
+separate exports (assessment, attendance, spending, graduation) without ever
+holding a whole export in memory:
+
+1. Each export is read in chunks. Keys are normalized (years such as
+   '2023-24' become '2023-2024', district and population names are trimmed,
+   whitespace-collapsed and matched case-insensitively, subject and
+   population aliases are applied) and every chunk is split by a hash of the
+   district into ``partitions`` pieces on disk.
+2. Each partition -- every row of its districts across all exports -- is
+   then loaded on its own, the assessment rows are pivoted to one column per
+   subject and the other exports are left-joined onto them. All rows of a
+   district land in the same partition, so the per-partition joins give the
+   same result as one big merge.
+3. Partitions are appended to the output, a CSV or an Arrow (Feather) file,
+   one at a time. Values stay as the warehouse text; ingest.py parses them.
+
+Rows exist for every assessment key; other exports only add columns.
+
+    python build_merged_dataset.py raw_exports/ [--output final_merged_assess_demo_df.csv]
+"""
+import argparse
+import glob
+import json
+import os
+import re
+import tempfile
+import time
+from dataclasses import dataclass, replace
+
+import pandas as pd
+
+from pps_dsg import files, ingest, metrics
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - pyarrow is in requirements.txt
+    pa = None
+
+OUTPUT_KEYS = ['Year', 'District Name', 'Population', 'Achievement Level']
+
+# Name of the assessment export's per-level value column before the subject pivot
+ACHIEVEMENT_VALUE = metrics.ACHIEVEMENT_PREFIX.rstrip('_')
+
+SUBJECT_ALIASES = {
+    'english language arts': 'ELA',
+    'english language arts/literacy': 'ELA',
+    'ela/literacy': 'ELA',
+    'mathematics': 'Math',
+}
+
+CHUNKSIZE = 200_000
+PARTITIONS = 16
+
+
+@dataclass(frozen=True)
+class RawSource:
+    """One kind of warehouse export and how its columns map onto the merged file
+
+    ``rename`` is a tuple of (export column, merged column) pairs; ``pivot``
+    names a column whose values become ``_{value}`` suffixes of ``values``.
+    """
+    name: str
+    pattern: str
+    keys: tuple
+    values: tuple
+    rename: tuple = ()
+    pivot: str = None
+
+
+SOURCES = [
+    RawSource(
+        name='assessment',
+        pattern='assessment*.csv',
+        keys=('Year', 'District Name', 'Population', 'Achievement Level'),
+        values=(ACHIEVEMENT_VALUE,),
+        pivot='Subject',
+    ),
+    RawSource(
+        name='attendance',
+        pattern='attendance*.csv',
+        keys=('Year', 'District Name', 'Population'),
+        values=tuple(metrics.METRICS['chronic_absenteeism'].raw_columns()),
+    ),
+    RawSource(
+        name='spending',
+        pattern='spending*.csv',
+        keys=('Year', 'District Name'),
+        values=tuple(metrics.METRICS['per_pupil_spending'].raw_columns()),
+    ),
+    RawSource(
+        name='graduation',
+        pattern='graduation*.csv',
+        keys=('Year', 'District Name', 'Population'),
+        values=tuple(metrics.METRICS['graduation_4yr'].raw_columns()
+                     + metrics.METRICS['graduation_56yr'].raw_columns()),
+    ),
+]
+
+# Join key standing in for 'District Name' while merging
+DISTRICT_KEY = '_district'
+
+
+def load_spec(path):
+    """SOURCES with overrides from a JSON file
+
+    The file maps a source name to any of "pattern", "rename" (an object of
+    export column -> merged column) and "keys", for exports laid out
+    differently, e.g. spending broken down by population.
+    """
+    with open(path) as fh:
+        overrides = json.load(fh)
+    sources = []
+    for source in SOURCES:
+        override = overrides.get(source.name, {})
+        sources.append(replace(
+            source,
+            pattern=override.get('pattern', source.pattern),
+            rename=tuple(override.get('rename', {}).items()) or source.rename,
+            keys=tuple(override.get('keys', source.keys)),
+        ))
+    return sources
+
+
+def school_year(text):
+    """'YYYY-YYYY' for '2023-24', '2023/2024' or '2024' (the year the school year ends)"""
+    text = text.strip()
+    match = re.fullmatch(r'(\d{4})\s*[-/]\s*(\d{2}|\d{4})', text)
+    if match:
+        start, end = match.groups()
+        return f"{start}-{int(start) + 1 if len(end) == 2 else end}"
+    if re.fullmatch(r'\d{4}', text):
+        return f"{int(text) - 1}-{text}"
+    return text
+
+
+def _map_unique(series, func):
+    """Apply ``func`` once per distinct value (labels repeat on every row)"""
+    return series.map({value: func(value) for value in series.dropna().unique()})
+
+
+def normalize_label(series):
+    """Trim and collapse whitespace"""
+    return series.str.strip().str.replace(r'\s+', ' ', regex=True)
+
+
+def _normalize_chunk(chunk, source, aliases):
+    chunk = chunk.rename(columns=dict(source.rename))
+    missing = [c for c in source.keys + source.values + ((source.pivot,) if source.pivot else ())
+               if c not in chunk.columns]
+    if missing:
+        raise ValueError(f"{source.name} export is missing columns {missing}; map them with a spec file")
+    labels = list(source.keys) + ([source.pivot] if source.pivot else [])
+    chunk = chunk[labels + list(source.values)].dropna(subset=labels)
+    chunk['Year'] = _map_unique(chunk['Year'], school_year)
+    chunk['District Name'] = normalize_label(chunk['District Name'])
+    # Districts are matched case-insensitively across exports
+    chunk[DISTRICT_KEY] = chunk['District Name'].str.casefold()
+    for col in ('Population', 'Achievement Level'):
+        if col in chunk.columns:
+            chunk[col] = _map_unique(normalize_label(chunk[col]), lambda v: aliases.get(v.casefold(), v))
+    if source.pivot:
+        chunk[source.pivot] = _map_unique(normalize_label(chunk[source.pivot]),
+                                          lambda v: SUBJECT_ALIASES.get(v.casefold(), v))
+    return chunk
+
+
+def partition_exports(raw_dir, sources, work_dir, partitions=PARTITIONS, chunksize=CHUNKSIZE, aliases=None):
+    """Stage 1: stream every export into hash partitions under ``work_dir``
+
+    Returns {source name: rows read}.
+    """
+    aliases = {k.casefold(): v for k, v in (aliases or {}).items()}
+    counts = {}
+    for source in sources:
+        paths = sorted(glob.glob(os.path.join(raw_dir, source.pattern)))
+        counts[source.name] = 0
+        piece = 0
+        for path in paths:
+            for chunk in pd.read_csv(path, dtype=str, keep_default_na=False, na_values=[''],
+                                     chunksize=chunksize):
+                chunk = _normalize_chunk(chunk, source, aliases)
+                counts[source.name] += len(chunk)
+                bucket = pd.util.hash_array(chunk[DISTRICT_KEY].to_numpy()) % partitions
+                for part, rows in chunk.groupby(bucket, sort=False):
+                    part_dir = os.path.join(work_dir, f'part-{int(part):04d}')
+                    os.makedirs(part_dir, exist_ok=True)
+                    piece_path = os.path.join(part_dir, f'{source.name}-{piece:06d}.feather')
+                    rows.reset_index(drop=True).to_feather(piece_path)
+                piece += 1
+    return counts
+
+
+def _read_pieces(part_dir, source):
+    paths = sorted(glob.glob(os.path.join(part_dir, f'{source.name}-*.feather')))
+    if not paths:
+        return None
+    return pd.concat([pd.read_feather(p) for p in paths], ignore_index=True)
+
+
+def output_columns(sources):
+    """Merged column order: keys, other exports' values, then the subject columns"""
+    columns = list(OUTPUT_KEYS)
+    for source in sources:
+        if not source.pivot:
+            columns += list(source.values)
+    for source in sources:
+        if source.pivot:
+            columns += [f'{value}_{subject}' for value in source.values for subject in metrics.SUBJECTS]
+    return columns
+
+
+def merge_partition(part_dir, sources):
+    """Stage 2: the merged rows of one partition (None when it has no assessment rows)"""
+    base_source, *others = sources
+    base = _read_pieces(part_dir, base_source)
+    if base is None:
+        return None
+    join_keys = [DISTRICT_KEY if k == 'District Name' else k for k in base_source.keys]
+    base = base.drop_duplicates(join_keys + [base_source.pivot])
+    names = base.drop_duplicates(DISTRICT_KEY).set_index(DISTRICT_KEY)['District Name']
+    wide = base.set_index(join_keys + [base_source.pivot])[list(base_source.values)].unstack(base_source.pivot)
+    wide.columns = [f'{value}_{subject}' for value, subject in wide.columns]
+    merged = wide.reset_index()
+    merged['District Name'] = merged[DISTRICT_KEY].map(names)
+
+    for source in others:
+        rows = _read_pieces(part_dir, source)
+        keys = [DISTRICT_KEY if k == 'District Name' else k for k in source.keys]
+        if rows is None:
+            rows = pd.DataFrame(columns=keys + list(source.values))
+        rows = rows.drop_duplicates(keys)[keys + list(source.values)]
+        merged = merged.merge(rows, on=keys, how='left')
+    return merged.reindex(columns=output_columns(sources))
+
+
+class _Writer:
+    """Appends frames to a CSV or an Arrow IPC file"""
+
+    def __init__(self, path, columns):
+        self.path = path
+        self.columns = columns
+        self.arrow = path.endswith(('.feather', '.arrow'))
+        self.tmp_path = files.temp_path(path)
+        self.rows = 0
+        if self.arrow:
+            if pa is None:
+                raise ImportError("writing Arrow output needs pyarrow")
+            self.schema = pa.schema([(c, pa.string()) for c in columns])
+            self._writer = pa.ipc.new_file(self.tmp_path, self.schema)
+        else:
+            open(self.tmp_path, 'w').close()
+
+    def write(self, df):
+        if self.arrow:
+            self._writer.write_table(pa.Table.from_pandas(df, schema=self.schema, preserve_index=False))
+        else:
+            df.to_csv(self.tmp_path, mode='a', header=self.rows == 0, index=False)
+        self.rows += len(df)
+
+    def close(self):
+        if self.arrow:
+            self._writer.close()
+        elif self.rows == 0:
+            pd.DataFrame(columns=self.columns).to_csv(self.tmp_path, index=False)
+        os.replace(self.tmp_path, self.path)
+
+
+def build_merged(raw_dir, output=ingest.DATA_PATH, sources=None, partitions=PARTITIONS,
+                 chunksize=CHUNKSIZE, aliases=None, work_dir=None):
+    """Build the merged dataset from the exports in ``raw_dir``; returns a stats dict"""
+    sources = sources or SOURCES
+    stats = {'partitions': partitions}
+    with tempfile.TemporaryDirectory(prefix='pps_dsg_build_', dir=work_dir) as tmp:
+        start = time.perf_counter()
+        stats['rows_read'] = partition_exports(raw_dir, sources, tmp, partitions, chunksize, aliases)
+        stats['partition_seconds'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        writer = _Writer(output, output_columns(sources))
+        try:
+            for part_dir in sorted(glob.glob(os.path.join(tmp, 'part-*'))):
+                merged = merge_partition(part_dir, sources)
+                if merged is not None:
+                    writer.write(merged)
+        finally:
+            writer.close()
+        stats['merge_seconds'] = time.perf_counter() - start
+        stats['rows_written'] = writer.rows
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the merged dashboard dataset from raw warehouse exports")
+    parser.add_argument('raw_dir', help="directory holding the exports (assessment*.csv, attendance*.csv, ...)")
+    parser.add_argument('--output', default=ingest.DATA_PATH, help="merged .csv or .feather file to write")
+    parser.add_argument('--spec', help="JSON file overriding export file patterns and column names")
+    parser.add_argument('--aliases', help="JSON file mapping population/level labels to the merged names")
+    parser.add_argument('--partitions', type=int, default=PARTITIONS, help="hash partitions (more = less memory)")
+    parser.add_argument('--chunksize', type=int, default=CHUNKSIZE, help="rows read per chunk")
+    args = parser.parse_args(argv)
+
+    sources = load_spec(args.spec) if args.spec else SOURCES
+    aliases = None
+    if args.aliases:
+        with open(args.aliases) as fh:
+            aliases = json.load(fh)
+    stats = build_merged(args.raw_dir, args.output, sources, args.partitions, args.chunksize, aliases)
+    print(f"Read {stats['rows_read']}; wrote {stats['rows_written']} merged rows to {args.output} "
+          f"({stats['partition_seconds']:.1f}s partitioning, {stats['merge_seconds']:.1f}s merging)")
@@ -0,0 +1,105 @@
+"""Offline precompute of every dashboard view into one bundle file.
+
+The set of views is small and fixed (metrics x years), so ``build_bundle``
+computes all of them up front, fanning the work out over a process pool, and
+pickles the result together with the district rank table, the statewide
+summary cube and the data version it was built from. In bundle mode the app reads
+only this file and never touches the CSV.
+"""
+import argparse
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from pps_dsg import cube, files, ingest, metrics, ranks, views
+from pps_dsg.dataset import Dataset, achievement_index, metric_index
+
+# Bump when the layout of a bundle or of a view changes
+BUNDLE_FORMAT = 5
+
+BUNDLE_PATH = "dashboard_bundle.pkl"
+
+# Per-worker indexes, built once by _init_worker
+_data_index = None
+_achievement_index = None
+
+
+def _init_worker(path):
+    global _data_index, _achievement_index
+    data = Dataset.open(path)
+    _data_index = metric_index(data)
+    _achievement_index = achievement_index(data)
+
+
+def _index(source):
+    return _achievement_index if source == 'achievement' else _data_index
+
+
+def _compute(key):
+    source, year = key
+    return key, views.year_views(_index(source), year, metrics.metrics_for_source(source))
+
+
+def _sources():
+    return [(_index(source), metrics.metrics_for_source(source)) for source in ('rows', 'achievement')]
+
+
+def rank_frame():
+    """District rank table over every registered metric"""
+    return ranks.rank_frame(_sources())
+
+
+def view_keys():
+    """(source, year) of every group of views the dashboard can show"""
+    return [
+        (source, year)
+        for source in ('rows', 'achievement')
+        for year in sorted(_index(source).levels['Year'])
+    ]
+
+
+def build_bundle(path=ingest.DATA_PATH, workers=None):
+    """Compute every view of the dataset at ``path`` and return the bundle dict"""
+    # Parse once here so every worker starts from the columnar cache
+    _init_worker(path)
+    keys = view_keys()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(path,)) as pool:
+        computed = dict(pool.map(_compute, keys))
+        rank_table = rank_frame()
+        cube_frame = cube.build_cube(_sources(), rank_table)
+    return {
+        'format': BUNDLE_FORMAT,
+        'data_version': _data_index.version,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'views': computed,
+        'ranks': rank_table,
+        'cube': cube_frame,
+    }
+
+
+def write_bundle(bundle, path=BUNDLE_PATH):
+    files.write_pickle(path, bundle)
+
+
+def read_bundle(path=BUNDLE_PATH):
+    """Load a bundle written by ``write_bundle``, rejecting other formats"""
+    with open(path, 'rb') as fh:
+        bundle = pickle.load(fh)
+    if bundle.get('format') != BUNDLE_FORMAT:
+        raise ValueError(f"{path} has bundle format {bundle.get('format')}, expected {BUNDLE_FORMAT}; rebuild it")
+    return bundle
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute every dashboard view into one bundle file")
+    parser.add_argument('--data', default=ingest.DATA_PATH, help="merged assessment/demographics CSV")
+    parser.add_argument('--output', default=BUNDLE_PATH, help="bundle file to write")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    bundle = build_bundle(args.data, args.workers)
+    write_bundle(bundle, args.output)
+    n_views = sum(len(group) for group in bundle['views'].values())
+    print(f"Wrote {n_views} views (data {bundle['data_version']}) "
+          f"to {args.output} in {time.perf_counter() - start:.1f}s")
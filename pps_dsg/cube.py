@@ -0,0 +1,202 @@
+"""Statewide summary cube: one row per (metric, year, population).
+
+The summary tables used to filter the merged rows once per group on every
+rerun, and all they got out of it was a mean. ``build_cube`` computes every
+registered metric, year and population in one go from the rank frame plus
+one groupby per source:
+
+- ``focal``: the focal district's value (Portland unless chosen otherwise)
+- ``state``: mean of the statewide column, the dashboard's "State" figure
+- ``mean``, ``q10``, ``q25``, ``median``, ``q75``, ``q90``, ``count``: the
+  distribution of district values, one value per district as in ranks.py
+- ``suppressed``: districts with no value because the warehouse suppressed
+  their cells ("*")
+
+The cube is built once per data version and every table reads from it.
+Analysts can take a copy with
+
+    python export_summary_cube.py [--output summary_cube.parquet] [--bundle FILE | --store DIR]
+"""
+import argparse
+import time
+
+import pandas as pd
+
+from pps_dsg import ingest, metrics, ranks
+from pps_dsg.dataset import Dataset, achievement_index, metric_index
+from pps_dsg.index import KEY_COLUMNS, DataIndex
+from pps_dsg.metrics import suppressed_column
+from pps_dsg.views import PORTLAND
+
+CUBE_KEYS = ('Metric', 'Year', 'Population')
+
+# Quantiles of the district values and their column names
+QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+QUANTILE_COLUMNS = ['q10', 'q25', 'median', 'q75', 'q90']
+
+STAT_COLUMNS = ['focal', 'state', 'mean'] + QUANTILE_COLUMNS + ['count', 'suppressed']
+
+CUBE_PATH = "summary_cube.csv"
+
+
+def district_stats(rank_frame):
+    """Mean, quantiles and count of the district values of every (metric, year, population)"""
+    grouped = rank_frame.groupby(list(CUBE_KEYS), observed=True, sort=False)['value']
+    stats = grouped.quantile(list(QUANTILES)).unstack()
+    stats.columns = QUANTILE_COLUMNS
+    stats['mean'] = grouped.mean()
+    stats['count'] = grouped.count()
+    return stats.reset_index()
+
+
+def source_stats(index, metric_list):
+    """Statewide mean and suppressed-district count of every metric of one source
+
+    A district counts as suppressed for a metric when it has no value and at
+    least one of its cells was "*" (see ingest.parse_frame).
+    """
+    keys = ['Year', 'Population']
+    state_columns = list(dict.fromkeys(m.statewide_column for m in metric_list))
+    state = index.columns(keys + state_columns).astype({c: 'float64' for c in state_columns})
+    state = state.groupby(keys, observed=True, sort=False)[state_columns].mean()
+
+    flagged = [m for m in metric_list if index.has_column(suppressed_column(m.column))]
+    value_columns = list(dict.fromkeys(m.column for m in flagged))
+    flag_columns = [suppressed_column(c) for c in value_columns]
+    if flagged:
+        grouped = index.columns(list(KEY_COLUMNS) + value_columns + flag_columns).groupby(
+            list(KEY_COLUMNS), observed=True, sort=False)
+        missing = grouped[value_columns].first().isna()
+        flags = grouped[flag_columns].any()
+
+    parts = []
+    for metric in metric_list:
+        part = pd.DataFrame({'state': state[metric.statewide_column]})
+        if metric in flagged:
+            suppressed = flags[suppressed_column(metric.column)] & missing[metric.column]
+            part['suppressed'] = suppressed.groupby(level=keys, observed=True, sort=False).sum()
+        part.insert(0, 'Metric', metric.key)
+        parts.append(part.reset_index())
+    return pd.concat(parts, ignore_index=True)
+
+
+def _plain_keys(frame):
+    return frame.astype({key: object for key in CUBE_KEYS})
+
+
+def _categorize(frame):
+    return _plain_keys(frame).astype({key: 'category' for key in CUBE_KEYS})
+
+
+def with_focal(frame, rank_frame, district=PORTLAND):
+    """Copy of a cube frame whose ``focal`` column holds ``district``'s values"""
+    values = rank_frame.loc[rank_frame['District Name'] == district, list(CUBE_KEYS) + ['value']]
+    frame = _plain_keys(frame.drop(columns='focal', errors='ignore')).merge(
+        _plain_keys(values).rename(columns={'value': 'focal'}), on=list(CUBE_KEYS), how='left')
+    frame = _categorize(frame[list(CUBE_KEYS) + STAT_COLUMNS])
+    frame.attrs['focal'] = district
+    return frame
+
+
+def build_cube(sources, rank_frame, focal=PORTLAND):
+    """Cube frame from ``[(DataIndex, [Metric, ...]), ...]`` and their rank_frame"""
+    totals = pd.concat([source_stats(index, metric_list) for index, metric_list in sources],
+                       ignore_index=True)
+    frame = _plain_keys(district_stats(rank_frame)).merge(_plain_keys(totals), on=list(CUBE_KEYS), how='outer')
+    for column in ('count', 'suppressed'):
+        frame[column] = frame[column].fillna(0).astype('int64')
+    # Registry order of metrics, then year and population
+    frame['order'] = frame['Metric'].map({key: i for i, key in enumerate(metrics.METRICS)})
+    frame = frame.sort_values(['order', 'Year', 'Population'], kind='stable', ignore_index=True)
+    return with_focal(frame, rank_frame, focal)
+
+
+def ranks_cube(rank_frame, focal=PORTLAND):
+    """Cube frame from district values alone, for groups without a statewide column
+
+    Used for peer groups (peers.py): ``state`` is the mean of the group's
+    district values and ``suppressed`` is unknown (NaN).
+    """
+    frame = district_stats(rank_frame)
+    frame['state'] = frame['mean']
+    frame['suppressed'] = float('nan')
+    return with_focal(frame, rank_frame, focal)
+
+
+def combine_frames(frames):
+    """One cube from cube frames of disjoint years (e.g. store partitions)"""
+    frames = list(frames)
+    combined = _categorize(pd.concat([_plain_keys(frame) for frame in frames], ignore_index=True))
+    combined.attrs['focal'] = frames[0].attrs.get('focal', PORTLAND) if frames else PORTLAND
+    return combined
+
+
+class SummaryCube:
+    """Lookups into a cube frame by (metric key, year, population)"""
+
+    def __init__(self, frame):
+        self.frame = frame
+        self.index = DataIndex(frame, keys=CUBE_KEYS)
+        self._stats = self.index.frame[STAT_COLUMNS].to_numpy(dtype='float64')
+
+    def lookup(self, metric_key, year, population):
+        """{stat: value} with None for missing values, or None for an unknown group"""
+        start, stop = self.index.bounds(metric_key, year, population)
+        if start == stop:
+            return None
+        return {name: value if value == value else None
+                for name, value in zip(STAT_COLUMNS, self._stats[start].tolist())}
+
+    def trend(self, metric_key, population, years):
+        """Stats of one metric and population indexed by ``years`` (NaN for years without data)"""
+        rows = []
+        for year in years:
+            start, stop = self.index.bounds(metric_key, year, population)
+            rows.append(self._stats[start] if start < stop else [float('nan')] * len(STAT_COLUMNS))
+        return pd.DataFrame(rows, index=pd.Index(list(years), dtype=object), columns=STAT_COLUMNS)
+
+
+def export(frame, path):
+    """Write a cube frame for analysts: Parquet for .parquet paths, CSV otherwise"""
+    # Back to the float32 precision of the parsed data, so values are written
+    # as parsed (43.1) rather than as their widened float64 (43.099998474121094)
+    floats = [column for column in STAT_COLUMNS if column not in ('count', 'suppressed')]
+    frame = _plain_keys(frame).astype({column: 'float32' for column in floats})
+    frame.insert(1, 'Label', frame['Metric'].map(lambda key: metrics.METRICS[key].label))
+    if path.endswith('.parquet'):
+        frame.to_parquet(path, index=False)
+    else:
+        frame.to_csv(path, index=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export the statewide summary cube as CSV or Parquet")
+    parser.add_argument('--output', default=CUBE_PATH, help="file to write (.csv or .parquet)")
+    inputs = parser.add_mutually_exclusive_group()
+    inputs.add_argument('--data', default=ingest.DATA_PATH, help="merged assessment/demographics CSV")
+    inputs.add_argument('--bundle', help="precomputed bundle (build_dashboard_bundle.py) to export")
+    inputs.add_argument('--store', help="year-partitioned store (ingest_year.py) to export")
+    parser.add_argument('--district', default=PORTLAND, help="focal district (default Portland Public Schools)")
+    args = parser.parse_args(argv)
+    # Imported here: bundle.py and store.py build cubes with this module
+    from pps_dsg import bundle, store
+
+    start = time.perf_counter()
+    if args.store:
+        data_store = store.Store(args.store)
+        derived = [data_store.derived(year) for year in data_store.years()]
+        frame = combine_frames(part['cube'] for part in derived)
+        rank_frame = ranks.combine_frames(part['ranks'] for part in derived)
+    elif args.bundle:
+        built = bundle.read_bundle(args.bundle)
+        frame, rank_frame = built['cube'], built['ranks']
+    else:
+        data = Dataset.open(args.data)
+        sources = [(metric_index(data), metrics.metrics_for_source('rows')),
+                   (achievement_index(data), metrics.metrics_for_source('achievement'))]
+        rank_frame = ranks.rank_frame(sources)
+        frame = build_cube(sources, rank_frame, args.district)
+    if frame.attrs.get('focal') != args.district:
+        frame = with_focal(frame, rank_frame, args.district)
+    export(frame, args.output)
+    print(f"Wrote {len(frame)} rows to {args.output} in {time.perf_counter() - start:.1f}s")
@@ -0,0 +1,81 @@
+"""Column-projected, lazily loaded view of the typed dataset.
+
+Pages only need the key columns plus one or two metric columns, yet loading
+the merged frame pulls every column into memory. ``Dataset`` memory-maps the
+uncompressed Arrow cache written by ingest.py and converts a column to pandas
+only the first time it is asked for; converted columns are kept, so one
+Dataset shared across sessions holds each column in memory at most once.
+"""
+import threading
+
+import pandas as pd
+
+from pps_dsg import achievement, ingest
+from pps_dsg.index import KEY_COLUMNS, DataIndex
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - pyarrow is in requirements.txt
+    pa = None
+
+
+class Dataset:
+    """Typed columns loaded on first use
+
+    Build one with ``Dataset.open(csv_path)``. Rows are in the key order
+    ingest.parse_frame sorts them into, so a DataIndex over
+    ``frame(KEY_COLUMNS)`` can use the Dataset as its column source.
+    """
+
+    def __init__(self, table=None, frame=None, version=''):
+        self.version = version
+        self._table = table
+        self._frame = frame
+        self._loaded = {}
+        self._lock = threading.Lock()
+        source = table if table is not None else frame
+        self.columns = list(source.column_names if table is not None else source.columns)
+
+    @classmethod
+    def open(cls, path=ingest.DATA_PATH):
+        """Dataset over the columnar cache of ``path`` (built first if stale)"""
+        cache_path, version, df = ingest.ensure_cache(path)
+        if cache_path is None or pa is None:
+            if df is None:
+                df = ingest.load_typed(path)
+            return cls(frame=df, version=version)
+        # Zero-copy: the table's buffers point into the mapped file, so
+        # columns stay on disk until a page reads them
+        table = pa.ipc.open_file(pa.memory_map(cache_path)).read_all()
+        return cls(table=table, version=version)
+
+    def column(self, name):
+        """One column as a pandas Series"""
+        if self._frame is not None:
+            return self._frame[name]
+        with self._lock:
+            series = self._loaded.get(name)
+            if series is None:
+                series = self._table.column(name).to_pandas()
+                series.name = name
+                self._loaded[name] = series
+        return series
+
+    def frame(self, names):
+        """Several columns as one frame, tagged with the data version"""
+        df = pd.DataFrame({name: self.column(name) for name in names})
+        df.attrs['data_version'] = self.version
+        return df
+
+
+def metric_index(dataset):
+    """DataIndex over the merged rows, reading metric columns lazily from ``dataset``"""
+    return DataIndex(dataset.frame(KEY_COLUMNS), source=dataset)
+
+
+def achievement_index(dataset):
+    """DataIndex over the combined "At or Above" totals, built from the columns they need"""
+    columns = [c for c in achievement.input_columns() if c in dataset.columns]
+    totals = achievement.at_or_above_totals(dataset.frame(columns))
+    totals.attrs['data_version'] = dataset.version
+    return DataIndex(totals)
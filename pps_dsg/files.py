@@ -0,0 +1,42 @@
+"""Atomic file writes.
+
+Caches, bundles, store partitions and site pages are read by running apps and
+file servers while they are rewritten. Every output is written under a
+temporary name next to its target and then renamed over it, so a reader sees
+either the old file or the new one, never a partial write.
+"""
+import os
+import pickle
+
+
+def temp_path(path):
+    """Temporary name for writing ``path``, unique to this process"""
+    return f"{path}.tmp{os.getpid()}"
+
+
+def write_atomic(path, write):
+    """Call ``write(tmp_path)`` and move the finished file to ``path``"""
+    tmp_path = temp_path(path)
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def write_bytes(path, data):
+    def write(tmp_path):
+        with open(tmp_path, 'wb') as fh:
+            fh.write(data)
+    write_atomic(path, write)
+
+
+def write_text(path, text):
+    def write(tmp_path):
+        with open(tmp_path, 'w', encoding='utf-8') as fh:
+            fh.write(text)
+    write_atomic(path, write)
+
+
+def write_pickle(path, obj):
+    def write(tmp_path):
+        with open(tmp_path, 'wb') as fh:
+            pickle.dump(obj, fh, protocol=pickle.HIGHEST_PROTOCOL)
+    write_atomic(path, write)
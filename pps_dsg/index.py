@@ -0,0 +1,128 @@
+"""Sorted group-offset index over the merged frame.
+
+Pages used to build boolean masks such as ``(df['Year'] == y) &
+(df['Population'] == p)`` for every population on every rerun, each one a
+full scan. ``DataIndex`` sorts the frame by its key columns once and records
+the row range of every key prefix, so a year/population/district slice is a
+dict lookup followed by a contiguous ``iloc`` slice.
+
+The index only needs the key columns. Other columns can come from a lazy
+``source`` (see dataset.py) and are fetched the first time they are used.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+KEY_COLUMNS = ('Year', 'Population', 'District Name')
+
+
+def _levels(series):
+    """Values of a key in category order, or in order of first appearance"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        observed = np.unique(series.cat.codes.to_numpy())
+        return list(series.cat.categories[observed[observed >= 0]])
+    return list(series.dropna().unique())
+
+
+def _codes(series):
+    """Integer codes (-1 for missing) and the values they refer to"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy(), np.asarray(series.cat.categories, dtype=object)
+    codes, uniques = pd.factorize(series)
+    return codes, np.asarray(uniques, dtype=object)
+
+
+class DataIndex:
+    """Frame sorted by ``keys`` plus the (start, stop) row range of every key prefix
+
+    ``bounds(year)``, ``bounds(year, population)`` and
+    ``bounds(year, population, district)`` all resolve in O(1). Unknown keys
+    give an empty range, matching what the old boolean masks returned.
+
+    ``source``, if given, supplies columns missing from ``df`` through
+    ``source.column(name)``, row-aligned with ``df``.
+    """
+
+    def __init__(self, df, keys=KEY_COLUMNS, source=None):
+        self.keys = tuple(keys)
+        self.source = source
+        # Content hash of the source data (see ingest.load_typed), if known
+        self.version = df.attrs.get('data_version', '')
+        # Pages assign plot colours by this order: category order for
+        # categoricals, otherwise order of first appearance in ``df``
+        self.levels = {key: _levels(df[key]) for key in self.keys}
+
+        codes, uniques = zip(*(_codes(df[key]) for key in self.keys))
+        keep = np.logical_and.reduce([c >= 0 for c in codes])
+        # np.lexsort sorts by its last array first
+        order = np.lexsort(codes[::-1])
+        order = order[keep[order]]
+        if len(order) == len(df) and np.all(order[1:] > order[:-1]):
+            self._order = None
+            self.frame = df.reset_index(drop=True)
+        else:
+            self._order = order
+            self.frame = df.iloc[order].reset_index(drop=True)
+        self._loaded = {}
+        self._lock = threading.Lock()
+        codes = [c[order] for c in codes]
+
+        self._bounds = {}
+        n = len(order)
+        changed = np.zeros(max(n - 1, 0), dtype=bool)
+        for depth in range(len(self.keys)):
+            changed |= codes[depth][1:] != codes[depth][:-1]
+            starts = np.concatenate(([0], np.flatnonzero(changed) + 1)) if n else np.array([], dtype=int)
+            stops = np.append(starts[1:], n)
+            labels = [uniques[d][codes[d][starts]] for d in range(depth + 1)]
+            for key, start, stop in zip(zip(*labels), starts.tolist(), stops.tolist()):
+                self._bounds[key] = (start, stop)
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.frame)
+
+    def bounds(self, *key):
+        """(start, stop) rows of ``key`` in the sorted frame"""
+        return self._bounds.get(key, (0, 0))
+
+    def has_column(self, name):
+        """Whether ``name`` is in the frame or can be fetched from ``source``"""
+        return name in self.frame.columns or (self.source is not None and name in self.source.columns)
+
+    def column(self, name):
+        """A whole column in index order, fetched from ``source`` on first use
+
+        When the source rows are already in index order its Series is
+        returned as is, so the source holds the only copy.
+        """
+        if name in self.frame.columns:
+            return self.frame[name]
+        if self._order is None and self.source is not None:
+            series = self.source.column(name)
+            if series.index.equals(self.frame.index):
+                return series
+        with self._lock:
+            series = self._loaded.get(name)
+            if series is None:
+                if self.source is None:
+                    raise KeyError(name)
+                series = self.source.column(name)
+                if self._order is not None:
+                    series = series.take(self._order)
+                series = series.reset_index(drop=True)
+                self._loaded[name] = series
+        return series
+
+    def columns(self, names):
+        """Several columns as one frame in index order"""
+        return pd.DataFrame({name: self.column(name) for name in names})
@@ -0,0 +1,162 @@
+"""Typed ingest of the merged assessment/demographics CSV (or Feather file).
+
+The warehouse export stores every metric as text ("12.3%", "14,665.52", "*").
+``parse_frame`` parses those strings once into float32 columns, keeps a
+boolean "(suppressed)" column per district metric recording its "*" cells
+(which parse to NaN like blank ones), turns the key
+columns into categoricals and sorts the rows by (Year, Population, District
+Name), keeping each row's position in the file as ``SOURCE_ROW``. ``ensure_cache`` keeps that result as an uncompressed Arrow/Feather
+file in a cache directory next to the CSV, keyed by the CSV's size/mtime/hash
+and the metric registry's parsers (metrics.registry_signature), so later starts skip the parse and can memory-map single columns
+(see dataset.py).
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from pps_dsg import files, metrics
+from pps_dsg.index import KEY_COLUMNS
+
+# Merged dataset the app and the command-line tools read by default; set
+# PPS_DSG_DATA to use another file, e.g. the Arrow (.feather) output of
+# build_merged_dataset.py
+DATA_PATH = os.environ.get("PPS_DSG_DATA", "final_merged_assess_demo_df.csv")
+CACHE_DIR = ".pps_dsg_cache"
+
+# Bump whenever the parsed layout changes so existing caches are rebuilt
+CACHE_VERSION = 4
+
+CATEGORY_COLUMNS = ['Year', 'Population', 'District Name', 'Achievement Level']
+
+# Categories kept in order of first appearance; pages colour populations by it
+APPEARANCE_ORDER_COLUMNS = ['Population', 'Achievement Level']
+
+# Position of each row in the source file, for orders that depend on it
+# after the rows are sorted (achievement.py)
+SOURCE_ROW = 'Source Row'
+
+
+def column_parsers(columns):
+    """{column: parser} for the numeric metric columns of a merged frame"""
+    registered = metrics.column_parsers()
+    parsers = {}
+    for col in columns:
+        if col in registered:
+            parsers[col] = registered[col]
+        elif col.startswith(metrics.ACHIEVEMENT_PREFIX):
+            parsers[col] = metrics.parse_percent
+    return parsers
+
+
+def read_source(path):
+    """The raw merged frame from a CSV or an Arrow/Feather file (see build.py)"""
+    if path.endswith(('.feather', '.arrow')):
+        return pd.read_feather(path)
+    return pd.read_csv(path, low_memory=False)
+
+
+def parse_frame(df):
+    """Convert a raw merged frame into its typed, key-sorted form"""
+    df = df.reset_index(drop=True)
+    df[SOURCE_ROW] = np.arange(len(df), dtype='int32')
+    for col in metrics.suppressible_columns():
+        if col in df.columns:
+            df[metrics.suppressed_column(col)] = metrics.suppressed_cells(df[col])
+    for col, parser in column_parsers(df.columns).items():
+        df[col] = parser(df[col])
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            categories = pd.unique(df[col].dropna())
+            if col not in APPEARANCE_ORDER_COLUMNS:
+                categories = sorted(categories)
+            df[col] = pd.Categorical(df[col], categories=categories)
+    keys = [key for key in KEY_COLUMNS if key in df.columns]
+    return df.sort_values(keys, kind='stable', ignore_index=True)
+
+
+def fingerprint(path, known=None):
+    """Size/mtime/sha256 of a file; the hash is reused while size and mtime match"""
+    stat = os.stat(path)
+    if known and known.get('size') == stat.st_size and known.get('mtime_ns') == stat.st_mtime_ns:
+        return known
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b''):
+            digest.update(chunk)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': digest.hexdigest()}
+
+
+def cache_paths(path):
+    """Locations of the columnar cache and its metadata for a CSV"""
+    cache_dir = os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIR)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(cache_dir, f"{stem}.feather"), os.path.join(cache_dir, f"{stem}.json")
+
+
+def _read_meta(meta_path):
+    try:
+        with open(meta_path) as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_meta(meta_path, meta):
+    files.write_text(meta_path, json.dumps(meta))
+
+
+def _write_cache(df, data_path, meta_path, meta):
+    os.makedirs(os.path.dirname(data_path), exist_ok=True)
+    # Uncompressed so readers can memory-map columns without decoding
+    files.write_atomic(data_path, lambda path: df.to_feather(path, compression='uncompressed'))
+    _write_meta(meta_path, meta)
+
+
+def ensure_cache(path=DATA_PATH):
+    """Make the columnar cache of ``path`` current
+
+    Returns ``(cache_path, version, df)``: ``version`` is the CSV's content
+    hash, ``df`` is the parsed frame when the CSV had to be parsed (None when
+    the cache was already current) and ``cache_path`` is None when no cache
+    could be written (pyarrow missing or a read-only checkout).
+    """
+    data_path, meta_path = cache_paths(path)
+    meta = _read_meta(meta_path)
+    registry = metrics.registry_signature()
+    known = None
+    if meta and meta.get('cache_version') == CACHE_VERSION and meta.get('registry') == registry:
+        known = meta
+    current = fingerprint(path, known)
+    version = current['sha256'][:12]
+
+    if known and known.get('sha256') == current['sha256'] and os.path.exists(data_path):
+        if current is not known:
+            # File was touched but not changed; remember the new mtime
+            try:
+                _write_meta(meta_path, dict(current, cache_version=CACHE_VERSION, registry=registry))
+            except OSError:
+                pass
+        return data_path, version, None
+
+    df = parse_frame(read_source(path))
+    df.attrs['data_version'] = version
+    try:
+        _write_cache(df, data_path, meta_path, dict(current, cache_version=CACHE_VERSION, registry=registry))
+    except (ImportError, OSError):
+        return None, version, df
+    return data_path, version, df
+
+
+def load_typed(path=DATA_PATH):
+    """Load the merged CSV as a typed frame, reading the columnar cache when it is current
+
+    The content hash of the CSV is exposed as ``df.attrs['data_version']``.
+    """
+    data_path, version, df = ensure_cache(path)
+    if df is None:
+        df = pd.read_feather(data_path)
+        df.attrs['data_version'] = version
+    return df
@@ -0,0 +1,277 @@
+"""The dashboard's data, cached once per server process.
+
+Every loader is an st.cache_resource function, so all sessions share one
+copy of each object. They live in this module rather than in the app script
+so they can be called before any session connects: ``start_warmup`` loads
+the data, the rank table, the summary cube and the default view's
+aggregates (first page, latest year) in a background thread, and imports
+matplotlib for its first chart. A session that arrives meanwhile waits on
+the same cache entries instead of computing them a second time.
+
+serve.py starts the warm-up with the server; under a plain ``streamlit run``
+the first session starts it.
+
+With a store, a partition and everything derived from it are held under the
+partition's year and replaced when the year is re-ingested (``_Latest``), so
+superseded versions do not stay resident. Bootstrap intervals and peer
+indexes are held the same way in every mode, per metric and year.
+"""
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+
+import streamlit as st
+
+from pps_dsg import bootstrap, bundle, cube, ingest, metrics, peers, ranks, render, store, timing, views
+from pps_dsg.dataset import Dataset, achievement_index, metric_index
+
+# Precomputed views (build_dashboard_bundle.py); when set, the CSV is never read
+BUNDLE_PATH = os.environ.get("PPS_DSG_BUNDLE")
+
+# Year-partitioned store (ingest_year.py); when set, the app reads each year's
+# precomputed partition and caches it under that partition's version, so
+# ingesting a year reloads only that year
+STORE_PATH = os.environ.get("PPS_DSG_STORE")
+
+
+# Typed dataset: columns are memory-mapped from the on-disk cache and loaded on
+# first use, once per server rather than once per session
+@st.cache_resource
+def load_dataset():
+    return Dataset.open(ingest.DATA_PATH)
+
+
+# Sorted (Year, Population, District) index, built once instead of masking per view
+@st.cache_resource
+def load_index():
+    return metric_index(load_dataset())
+
+
+# "At or Above" totals for every year/population/district/subject in one groupby
+@st.cache_resource
+def load_achievement_index():
+    return achievement_index(load_dataset())
+
+
+@st.cache_resource
+def load_bundle():
+    return bundle.read_bundle(BUNDLE_PATH)
+
+
+@st.cache_resource
+def open_store():
+    return store.Store(STORE_PATH)
+
+
+class _Latest:
+    """Values loaded per key, keeping only the latest version of each
+
+    Asking for a new version of a key drops the old one. Loads hold the
+    lock, so concurrent sessions wait for one load instead of repeating it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def get(self, key, version, load):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                # Release the superseded value before loading its replacement
+                self._entries.pop(key, None)
+                entry = self._entries[key] = (version, load())
+            return entry[1]
+
+
+# Store data: {year: derived partition}, {(source, year): views} and the
+# rank table and cube combined over all partitions
+_partitions = _Latest()
+_partition_views = _Latest()
+_combined = _Latest()
+
+
+def load_partition(year, version):
+    return _partitions.get(year, version, lambda: open_store().derived(year))
+
+
+def data_versions():
+    """({year: partition version}, data version) of the data being shown
+
+    Read on every rerun so a store picks up newly ingested years.
+    """
+    if STORE_PATH:
+        partition_versions = open_store().versions()
+        return partition_versions, store.combined_version(partition_versions)
+    return {}, load_bundle()['data_version'] if BUNDLE_PATH else load_index().version
+
+
+def page_years(page_spec):
+    """Years a page offers; with a store, every ingested year with data for its metrics"""
+    return open_store().years(page_spec.metrics) if STORE_PATH else list(page_spec.years)
+
+
+# Value, percentile and z-score of every district/year/population/metric,
+# so switching the focal district is a lookup
+def load_ranks(data_version, partitions=()):
+    if STORE_PATH:
+        return _combined.get('ranks', partitions, lambda: ranks.RankTable(
+            ranks.combine_frames(load_partition(y, v)['ranks'] for y, v in partitions)))
+    return _load_ranks(data_version)
+
+
+@st.cache_resource
+def _load_ranks(data_version):
+    if BUNDLE_PATH:
+        return ranks.RankTable(load_bundle()['ranks'])
+    return ranks.RankTable(ranks.rank_frame([
+        (load_index(), metrics.metrics_for_source('rows')),
+        (load_achievement_index(), metrics.metrics_for_source('achievement')),
+    ]))
+
+
+# KDE curves of every metric of a source ('rows' or 'achievement') for one
+# year, computed in a single pass. Shared by every session without copying;
+# the arrays are frozen so none can modify them
+def load_year_views(source, year, version, timer=timing.NULL_TIMER):
+    if STORE_PATH:
+        return _partition_views.get((source, year), version, lambda: _frozen(
+            load_partition(year, version)['views'][source]))
+    return _load_year_views(source, year, version, timer)
+
+
+@st.cache_resource
+def _load_year_views(source, year, version, _timer=timing.NULL_TIMER):
+    if BUNDLE_PATH:
+        return _frozen(load_bundle()['views'].get((source, year), {}))
+    index = load_achievement_index() if source == 'achievement' else load_index()
+    return _frozen(views.year_views(index, year, metrics.metrics_for_source(source), timer=_timer))
+
+
+def _frozen(year_views):
+    return {key: views.freeze(view) for key, view in year_views.items()}
+
+
+# Statewide summary cube: focal value, state mean, district mean, quartiles,
+# count and suppressed count of every metric, year and population, built once
+# per data version. Every table reads from it
+def load_cube(data_version, partitions=()):
+    if STORE_PATH:
+        return _combined.get('cube', partitions, lambda: cube.SummaryCube(
+            cube.combine_frames(load_partition(y, v)['cube'] for y, v in partitions)))
+    return _load_cube(data_version)
+
+
+@st.cache_resource
+def _load_cube(data_version):
+    if BUNDLE_PATH:
+        return cube.SummaryCube(load_bundle()['cube'])
+    return cube.SummaryCube(cube.build_cube([
+        (load_index(), metrics.metrics_for_source('rows')),
+        (load_achievement_index(), metrics.metrics_for_source('achievement')),
+    ], load_ranks(data_version).frame))
+
+
+_intervals = _Latest()
+_peer_indexes = _Latest()
+
+
+# Bootstrap confidence interval of the mean district value and percentile
+# bands of every district, for one metric and year; computed once per
+# version of the year's data and shared
+def load_intervals(metric_key, year, version, rank_table):
+    return _intervals.get((metric_key, year), version, lambda: bootstrap.metric_year_intervals(
+        rank_table, metric_key, year, views.SUMMARY_GROUPS))
+
+
+# The same within one peer group; bounded like load_peer_group, since every
+# focal district, number of peers, metric and year has its own entry
+@st.cache_resource(max_entries=256)
+def load_peer_intervals(metric_key, year, version, peer_group, _rank_table):
+    return bootstrap.metric_year_intervals(_rank_table, metric_key, year, views.SUMMARY_GROUPS)
+
+
+def comparison_intervals(metric_key, year, version, rank_table, peer_group=()):
+    """Intervals of the comparison table, against the State or a peer group (its districts)"""
+    if peer_group:
+        return load_peer_intervals(metric_key, year, version, tuple(peer_group), rank_table)
+    return load_intervals(metric_key, year, version, rank_table)
+
+
+# Standardized multi-metric profiles of every district in one year, the
+# nearest-neighbour index behind the "Similar Districts" comparison
+def load_peer_index(year, version, rank_table):
+    return _peer_indexes.get(year, version, lambda: peers.PeerIndex(rank_table.frame, year))
+
+
+# A peer group ranked and summarized among itself; one entry per group (focal
+# district plus its neighbours), bounded since every focal district and k has one
+@st.cache_resource(max_entries=64)
+def load_peer_group(data_version, partitions, districts, focal):
+    group_ranks, group_cube = peers.peer_frames(load_ranks(data_version, partitions).frame, districts, focal)
+    return ranks.RankTable(group_ranks), cube.SummaryCube(group_cube)
+
+
+def load_view(metric, year, version, timer=timing.NULL_TIMER):
+    return load_year_views(metric.source, year, version, timer).get(metric.key) or views.empty_view()
+
+
+# Encoded charts shared by every session
+@st.cache_resource
+def figure_cache():
+    return render.FigureCache()
+
+
+def warm_default_view():
+    """Load everything the first page's latest year needs"""
+    start = time.perf_counter()
+    partition_versions, data_version = data_versions()
+    partitions = tuple(sorted(partition_versions.items()))
+    rank_table = load_ranks(data_version, partitions)
+    load_cube(data_version, partitions)
+    page_spec = next(iter(metrics.PAGES.values()))
+    years = page_years(page_spec)
+    if years:
+        metric = metrics.METRICS[page_spec.metrics[0]]
+        version = partition_versions.get(years[-1], data_version)
+        load_view(metric, years[-1], version)
+        comparison_intervals(metric.key, years[-1], version, rank_table)
+    render.load_matplotlib()
+    timing.record_startup('warm-up', time.perf_counter() - start)
+
+
+_WARMUP_THREAD = 'pps-dsg-warmup'
+
+
+class _WarmupWarnings(logging.Filter):
+    """Drops the "missing ScriptRunContext" warnings of cached calls made by the warm-up thread"""
+
+    def filter(self, record):
+        return record.threadName != _WARMUP_THREAD
+
+
+def _warm():
+    logging.getLogger('streamlit.runtime.scriptrunner_utils.script_run_context').addFilter(_WarmupWarnings())
+    try:
+        warm_default_view()
+    except Exception:
+        # Sessions load on demand and report the error themselves
+        print("Cache warm-up failed:", file=sys.stderr)
+        traceback.print_exc()
+
+
+_warmup_lock = threading.Lock()
+_warmup_thread = None
+
+
+def start_warmup():
+    """Start warm_default_view in a daemon thread, once per process; returns the thread"""
+    global _warmup_thread
+    with _warmup_lock:
+        if _warmup_thread is None:
+            _warmup_thread = threading.Thread(target=_warm, name=_WARMUP_THREAD, daemon=True)
+            _warmup_thread.start()
+    return _warmup_thread
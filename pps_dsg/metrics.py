@@ -0,0 +1,258 @@
+"""Registry of the metrics and pages the dashboard shows.
+
+Each ``Metric`` names its column, the statewide column it is compared with,
+the parser that cleans its raw text, the x-axis range and the formatter used
+in the summary table. ``PAGES`` groups metrics into sidebar pages. Ingest,
+the per-year view computation, the bundle builder and the app all read these
+definitions, so a new warehouse metric is one registry entry.
+"""
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import numpy as np
+import pandas as pd
+
+ACHIEVEMENT_PREFIX = 'Percentage of Students at Achievement Level_'
+
+SUBJECTS = ['ELA', 'Math', 'Science']
+
+
+def subject_column(subject):
+    """Source column holding the per-level percentage for a subject"""
+    return f'{ACHIEVEMENT_PREFIX}{subject}'
+
+
+def total_column(subject):
+    """Column of achievement.at_or_above_totals holding the combined value for a subject"""
+    return f'At or Above State Expectations_{subject}'
+
+
+# Cells the warehouse withholds for small counts
+SUPPRESSED = '*'
+
+
+def suppressed_column(column):
+    """Boolean column recording which cells of ``column`` were suppressed"""
+    return f'{column} (suppressed)'
+
+
+def suppressed_cells(series):
+    """True where a raw text cell is the suppression marker"""
+    if pd.api.types.is_numeric_dtype(series):
+        return pd.Series(False, index=series.index, name=series.name)
+    codes, uniques = pd.factorize(series)
+    marked = pd.Series(uniques, dtype=str).str.strip().eq(SUPPRESSED).to_numpy()
+    return pd.Series((codes >= 0) & marked[codes], index=series.index, name=series.name)
+
+
+def parse_encoded(series, strip=('%', ',')):
+    """Parse a text column into float32, dropping ``strip`` characters ('*' becomes NaN)"""
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype(np.float32)
+    # The same few strings repeat across districts (statewide values, '*'),
+    # so only the distinct values are parsed and the codes mapped back.
+    codes, uniques = pd.factorize(series)
+    cleaned = pd.Series(uniques, dtype=str)
+    for char in strip:
+        cleaned = cleaned.str.replace(char, '', regex=False)
+    parsed = pd.to_numeric(cleaned.str.strip(), errors='coerce').to_numpy(dtype=np.float32)
+    values = np.full(len(series), np.nan, dtype=np.float32)
+    valid = codes >= 0
+    values[valid] = parsed[codes[valid]]
+    return pd.Series(values, index=series.index, name=series.name)
+
+
+def parse_percent(series):
+    """'12.3%' -> 12.3"""
+    return parse_encoded(series, strip=('%',))
+
+
+def parse_amount(series):
+    """'14,665.52' -> 14665.52"""
+    return parse_encoded(series, strip=(',', '$'))
+
+
+def format_percent(value):
+    return f"{value:.1f}%"
+
+
+def format_dollars(value):
+    return f"${value:,.0f}"
+
+
+@dataclass(frozen=True)
+class Metric:
+    """One plotted quantity and how to clean, draw and summarise it
+
+    ``source`` is 'rows' for columns of the merged frame and 'achievement'
+    for the combined "At or Above" columns built by achievement.py.
+    """
+    key: str
+    label: str
+    column: str
+    statewide_column: str
+    parser: Callable
+    xlim: tuple
+    formatter: Callable
+    xlabel: str
+    chart_title: str
+    legend_loc: str = 'upper right'
+    source: str = 'rows'
+    raw_column: Optional[str] = None
+
+    def raw_columns(self):
+        """Columns of the merged CSV that ``parser`` applies to"""
+        if self.raw_column:
+            return [self.raw_column]
+        return [self.column, self.statewide_column]
+
+
+@dataclass(frozen=True)
+class Page:
+    """A sidebar page; pages with several metrics get a selector for them"""
+    name: str
+    title: str
+    description: str
+    years: tuple
+    metrics: tuple
+    selector_label: Optional[str] = None
+
+
+def _achievement_metric(subject):
+    return Metric(
+        key=f'achievement_{subject.lower()}',
+        label=subject,
+        column=total_column(subject),
+        statewide_column=total_column(subject),
+        parser=parse_percent,
+        xlim=(0, 100),
+        formatter=format_percent,
+        xlabel=f'{subject} Achievement - At or Above State Expectations (%)',
+        chart_title=f'Statewide Distribution of {subject} Achievement',
+        source='achievement',
+        raw_column=subject_column(subject),
+    )
+
+
+METRICS = {metric.key: metric for metric in [
+    Metric(
+        key='chronic_absenteeism',
+        label='Chronic Absenteeism',
+        column='Percentage of Students Chronically Absent',
+        statewide_column='Statewide - Percentage of Students Chronically Absent',
+        parser=parse_percent,
+        xlim=(0, 90),
+        formatter=format_percent,
+        xlabel='Percentage of Students Chronically Absent',
+        chart_title='Statewide Distribution of Chronic Absenteeism',
+    ),
+    Metric(
+        key='per_pupil_spending',
+        label='Per Pupil Spending',
+        column='Per Pupil Amount',
+        statewide_column='Statewide Per Pupil',
+        parser=parse_amount,
+        xlim=(5000, 35000),
+        formatter=format_dollars,
+        xlabel='Per Pupil Amount ($)',
+        chart_title='Statewide Distribution of Per Pupil Spending',
+    ),
+    Metric(
+        key='graduation_4yr',
+        label='4-Year Graduation Rate',
+        column='Four Year Graduation Rate',
+        statewide_column='Four Year Statewide Graduation Rate',
+        parser=parse_percent,
+        xlim=(20, 100),
+        formatter=format_percent,
+        xlabel='Four Year Graduation Rate (%)',
+        chart_title='Statewide Distribution of Four Year Graduation Rates',
+        legend_loc='upper left',
+    ),
+    Metric(
+        key='graduation_56yr',
+        label='5/6-Year Graduation Rate',
+        column='Five/Six Year Graduation Rate',
+        statewide_column='Five/Six Year Statewide Graduation Rate',
+        parser=parse_percent,
+        xlim=(30, 100),
+        formatter=format_percent,
+        xlabel='Five/Six Year Graduation Rate (%)',
+        chart_title='Statewide Distribution of Five/Six Year Graduation Rates',
+        legend_loc='upper left',
+    ),
+] + [_achievement_metric(subject) for subject in SUBJECTS]}
+
+_METRIC_YEARS = ("2017-2018", "2018-2019", "2019-2020", "2020-2021", "2021-2022", "2022-2023", "2023-2024")
+
+PAGES = {page.name: page for page in [
+    Page(
+        name="Chronic Absenteeism",
+        title="Chronic Absenteeism Analysis",
+        description="Distribution of chronic absenteeism rates across Maine school districts",
+        years=_METRIC_YEARS,
+        metrics=('chronic_absenteeism',),
+    ),
+    Page(
+        name="Per Pupil Spending",
+        title="Per Pupil Spending Analysis",
+        description="Distribution of per pupil spending across Maine school districts",
+        years=_METRIC_YEARS,
+        metrics=('per_pupil_spending',),
+    ),
+    Page(
+        name="4-Year Graduation Rate",
+        title="4-Year Graduation Rate Analysis",
+        description="Distribution of 4-year graduation rates across Maine school districts",
+        years=_METRIC_YEARS,
+        metrics=('graduation_4yr',),
+    ),
+    Page(
+        name="5/6-Year Graduation Rate",
+        title="5/6-Year Graduation Rate Analysis",
+        description="Distribution of 5/6-year graduation rates across Maine school districts",
+        years=_METRIC_YEARS,
+        metrics=('graduation_56yr',),
+    ),
+    Page(
+        name="Academic Achievement",
+        title="Academic Achievement Analysis",
+        description="Students performing at or above state expectations",
+        years=("2015-2016", "2016-2017", "2017-2018", "2018-2019", "2022-2023", "2023-2024"),
+        metrics=tuple(f'achievement_{subject.lower()}' for subject in SUBJECTS),
+        selector_label="Select Subject",
+    ),
+]}
+
+
+def metrics_for_source(source):
+    """Registered metrics computed from one source ('rows' or 'achievement')"""
+    return [metric for metric in METRICS.values() if metric.source == source]
+
+
+def column_parsers():
+    """{raw CSV column: parser} for every registered metric"""
+    parsers = {}
+    for metric in METRICS.values():
+        for column in metric.raw_columns():
+            parsers.setdefault(column, metric.parser)
+    return parsers
+
+
+def suppressible_columns():
+    """Raw CSV columns whose suppressed cells ingest records (district values, not statewide)"""
+    return list(dict.fromkeys(metric.raw_column or metric.column for metric in METRICS.values()))
+
+
+def registry_signature():
+    """Short hash of how ingest parses the raw columns
+
+    Covers every registered column with its parser and the columns whose
+    suppressed cells are recorded; the parsed-data caches (ingest.py,
+    store.py) are rebuilt when it changes.
+    """
+    parsers = sorted((column, parser.__name__) for column, parser in column_parsers().items())
+    payload = json.dumps([parsers, suppressible_columns()])
+    return hashlib.sha256(payload.encode()).hexdigest()[:12]
@@ -0,0 +1,87 @@
+"""Peer districts: the districts most similar to a focal district.
+
+Comparing a district to the whole state blends very different districts.
+``PeerIndex`` holds, for one year, every district's profile: its z-score
+(from the rank table) on each metric in ``PROFILE_METRICS`` for
+``PROFILE_POPULATION``, i.e. spending, chronic absenteeism, graduation rates
+and achievement on a common scale. A lookup is one vectorized distance
+computation from the focal profile to all others, so the index is built
+once per year and queries stay interactive for thousands of districts (or
+schools).
+
+Profiles may have gaps (no graduation rate for an elementary district, no
+assessments in 2020-2021). Distances use the metrics both districts report,
+scaled up to the full number of metrics, and districts sharing fewer than
+``MIN_SHARED`` metrics with the focal district are not considered.
+
+``peer_frames`` ranks the peer group among itself and summarizes it like
+the state (ranks.rerank, cube.ranks_cube), so the charts and tables can be
+drawn against the peers with the same code as against the state.
+"""
+import numpy as np
+
+from pps_dsg import cube, metrics, ranks
+from pps_dsg.views import PORTLAND
+
+PROFILE_METRICS = tuple(metrics.METRICS)
+
+PROFILE_POPULATION = 'All Students'
+
+# Default number of peers
+K = 10
+
+MIN_SHARED = 2
+
+
+class PeerIndex:
+    """Standardized profiles of every district in one year"""
+
+    def __init__(self, rank_frame, year, population=PROFILE_POPULATION, metric_keys=PROFILE_METRICS):
+        rows = rank_frame[(rank_frame['Year'] == year) & (rank_frame['Population'] == population)
+                          & rank_frame['Metric'].isin(metric_keys)]
+        profiles = rows.pivot_table(index='District Name', columns='Metric', values='z', observed=True)
+        # Metrics nobody reports this year carry no information
+        profiles = profiles.dropna(axis=1, how='all')
+        self.year = year
+        self.metrics = [key for key in metric_keys if key in profiles.columns]
+        profiles = profiles[self.metrics]
+        self.districts = profiles.index.astype(object).to_numpy()
+        self._position = {district: i for i, district in enumerate(self.districts)}
+        self._valid = profiles.notna().to_numpy()
+        self._values = np.nan_to_num(profiles.to_numpy(dtype='float64'))
+
+    def __len__(self):
+        return len(self.districts)
+
+    def distances(self, district):
+        """Distance from ``district`` to every district (inf where not comparable), or None"""
+        i = self._position.get(district)
+        if i is None:
+            return None
+        shared = self._valid & self._valid[i]
+        counts = shared.sum(axis=1)
+        squared = np.where(shared, (self._values - self._values[i]) ** 2, 0.0).sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            distance = np.sqrt(squared * len(self.metrics) / counts)
+        distance[counts < MIN_SHARED] = np.inf
+        distance[i] = np.inf
+        return distance
+
+    def neighbours(self, district, k=K):
+        """[(district, distance)] of the ``k`` nearest districts, nearest first"""
+        distance = self.distances(district)
+        if distance is None:
+            return []
+        k = min(k, int(np.isfinite(distance).sum()))
+        if k <= 0:
+            return []
+        nearest = np.argpartition(distance, k - 1)[:k]
+        nearest = nearest[np.argsort(distance[nearest], kind='stable')]
+        return [(self.districts[j], float(distance[j])) for j in nearest]
+
+
+def peer_frames(rank_frame, districts, focal=PORTLAND):
+    """(rank frame, cube frame) of ``districts`` ranked and summarized among themselves"""
+    group = rank_frame[rank_frame['District Name'].isin(list(districts))]
+    group_ranks = ranks.rerank(group)
+    return group_ranks, cube.ranks_cube(group_ranks, focal)
@@ -0,0 +1,97 @@
+"""Percentile ranks and z-scores of every district.
+
+One value per (metric, year, population, district) -- the district's first
+non-missing value, as the Portland markers have always used -- ranked within
+its (metric, year, population) group with vectorized groupby ranks. The
+table is built once, so choosing a different focal district is a lookup.
+"""
+import pandas as pd
+
+from pps_dsg.index import KEY_COLUMNS, DataIndex
+
+RANK_KEYS = ('Metric',) + KEY_COLUMNS
+
+
+def _district_values(index, metric_list):
+    """Long frame of (Metric, Year, Population, District Name, value)"""
+    if not metric_list:
+        return None
+    keys = list(KEY_COLUMNS)
+    columns = {metric.column: metric.key for metric in metric_list}
+    frame = index.columns(keys + list(columns))
+    # groupby.first skips missing cells, matching the old dropna().iloc[0]
+    first = frame.groupby(keys, observed=True, sort=False)[list(columns)].first()
+    long = first.rename(columns=columns).melt(ignore_index=False, var_name='Metric', value_name='value')
+    return long.dropna(subset=['value']).reset_index()
+
+
+def _categorize(ranks):
+    for key in RANK_KEYS:
+        ranks[key] = ranks[key].astype(object).astype('category')
+    return ranks
+
+
+def combine_frames(frames):
+    """One rank table from rank_frames of disjoint years (e.g. store partitions)
+
+    Ranks are within (metric, year, population), so per-year tables can be
+    concatenated as they are.
+    """
+    return _categorize(pd.concat(list(frames), ignore_index=True))
+
+
+def rank_frame(sources):
+    """Rank table from ``[(DataIndex, [Metric, ...]), ...]``"""
+    parts = [_district_values(index, metric_list) for index, metric_list in sources]
+    ranks = _categorize(pd.concat([p for p in parts if p is not None], ignore_index=True))
+    ranks['value'] = ranks['value'].astype('float64')
+    return rerank(ranks)
+
+
+def rerank(ranks):
+    """Percentile and z-score of every value within its (metric, year, population)
+
+    Also used to rank a subset of districts among themselves (peers.py).
+    """
+    ranks = ranks.reset_index(drop=True)
+    groups = ranks.groupby(['Metric', 'Year', 'Population'], observed=True, sort=False)['value']
+    ranks['percentile'] = groups.rank(pct=True) * 100
+    mean = groups.transform('mean')
+    std = groups.transform('std')
+    ranks['z'] = (ranks['value'] - mean) / std.where(std > 0)
+    return ranks
+
+
+class RankTable:
+    """Lookups into a rank_frame by (metric key, year, population, district)"""
+
+    def __init__(self, frame):
+        self.frame = frame
+        self.index = DataIndex(frame, keys=RANK_KEYS)
+        self._stats = self.index.frame[['value', 'percentile', 'z']].to_numpy()
+
+    def districts(self):
+        """Every district with at least one ranked value, sorted"""
+        return sorted(self.frame['District Name'].unique())
+
+    def lookup(self, metric_key, year, population, district):
+        """{'value', 'percentile', 'z'} for one district, or None"""
+        start, stop = self.index.bounds(metric_key, year, population, district)
+        if start == stop:
+            return None
+        value, percentile, z = self._stats[start].tolist()
+        return {'value': value, 'percentile': percentile, 'z': z if z == z else None}
+
+    def group(self, metric_key, year, population):
+        """(districts, values) of every ranked district in one (metric, year, population)"""
+        start, stop = self.index.bounds(metric_key, year, population)
+        districts = self.index.frame['District Name'].iloc[start:stop].to_numpy()
+        return districts, self._stats[start:stop, 0]
+
+    def value(self, metric_key, year, population, district):
+        found = self.lookup(metric_key, year, population, district)
+        return found['value'] if found else None
+
+    def markers(self, metric_key, year, populations, district):
+        """The district's value for each population (None where missing)"""
+        return [self.value(metric_key, year, pop, district) for pop in populations]
@@ -0,0 +1,204 @@
+"""Drawing and caching of the dashboard charts.
+
+``draw_view`` turns a view (see views.py) into the statewide KDE figure.
+``st.pyplot`` rasterized a fresh figure for every rerun of every session and
+the pages never closed their figures; ``FigureCache`` keeps the encoded bytes
+of each chart in a size-bounded LRU, and the figure itself is garbage once
+encoded, so one chart is drawn once and then served from memory.
+
+matplotlib is imported by ``load_matplotlib()`` when the first chart is
+drawn rather than with this module, so the app can render its sidebar
+without paying for it. Figures are built on their own Agg canvas
+(``new_figure``), not through pyplot, whose global figure registry is not
+safe to use from the app's concurrent script threads.
+"""
+import io
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from pps_dsg import timing, trends
+
+# Global font settings for every chart
+RC_PARAMS = {
+    'font.size': 10,           # General font size
+    'axes.titlesize': 12,      # Title font size
+    'axes.labelsize': 10,      # Axis label font size
+    'xtick.labelsize': 9,      # X-axis tick label size
+    'ytick.labelsize': 9,      # Y-axis tick label size
+    'legend.fontsize': 9       # Legend font size
+}
+
+# Define consistent colors (matplotlib default colors)
+COLORS = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b', '#e377c2', '#7f7f7f', '#bcbd22', '#17becf']
+
+# Marker line style of each selected focal district, in selection order
+FOCAL_LINESTYLES = [':', '--', '-.', (0, (1, 4))]
+
+# st.pyplot's own savefig settings, so cached images look the same
+SAVEFIG_KWARGS = {'bbox_inches': 'tight', 'dpi': 200}
+
+
+_figure_classes = None
+
+
+def load_matplotlib():
+    """(Figure, FigureCanvasAgg), imported on first use; the first import is timed"""
+    global _figure_classes
+    if _figure_classes is None:
+        start = time.perf_counter()
+        import matplotlib
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+        # Set once for the process: rc_context around each draw would change
+        # the global rcParams under other threads' draws
+        matplotlib.rcParams.update(RC_PARAMS)
+        _figure_classes = Figure, FigureCanvasAgg
+        timing.record_startup('import matplotlib', time.perf_counter() - start)
+    return _figure_classes
+
+
+def new_figure(figsize=(7, 3.5)):
+    """(figure, axes) on a private Agg canvas, outside pyplot's figure registry"""
+    Figure, FigureCanvasAgg = load_matplotlib()
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig, fig.add_subplot()
+
+
+# Helper function to draw a precomputed KDE curve
+def create_kde_plot(grid, density, ax, label, color):
+    """Draw a KDE curve from pps_dsg.kde the way sns.kdeplot would"""
+    if np.isfinite(density).any():
+        line, = ax.plot(grid, density, label=label, color=color, linewidth=2)
+        # No autoscale margin below zero density
+        line.sticky_edges.y[:] = (0, np.inf)
+        return color
+    return None
+
+
+def draw_view(view, metric, year, focal=(), title=None):
+    """Statewide KDE figure of one view with a marker line per focal district
+
+    ``focal`` is [(district, [value per population of the view]), ...], as
+    from ranks.RankTable.markers; each district gets its own line style.
+    ``title`` replaces the statewide title, e.g. for a peer group.
+    """
+    fig, ax = new_figure()
+    from matplotlib.lines import Line2D
+    for i, pop in enumerate(view['populations']):
+        create_kde_plot(view['grid'], view['densities'][i], ax, pop, COLORS[i % len(COLORS)])
+
+        # Add focal district lines
+        for j, (_, markers) in enumerate(focal):
+            if markers[i] is not None:
+                ax.axvline(markers[i], color=COLORS[i % len(COLORS)],
+                           linestyle=FOCAL_LINESTYLES[j % len(FOCAL_LINESTYLES)], linewidth=2)
+
+    ax.set_xlabel(metric.xlabel)
+    ax.set_ylabel('Density')
+    ax.set_title(title or f'{metric.chart_title}: {year}')
+    ax.set_xlim(*metric.xlim)
+
+    # Add legend
+    handles, labels = ax.get_legend_handles_labels()
+    for j, (district, _) in enumerate(focal):
+        linestyle = FOCAL_LINESTYLES[j % len(FOCAL_LINESTYLES)]
+        handles.append(Line2D([], [], color='black', linestyle=linestyle, linewidth=2, label=district))
+        labels.append(district)
+    ax.legend(handles, labels, title="Population", loc=metric.legend_loc)
+    return fig
+
+
+def draw_trend(rows, metric, population, focal=(), title=None, group='State'):
+    """Statewide bands, mean and median of one population across years
+
+    ``rows`` is cube.SummaryCube.trend output; ``focal`` is
+    [(district, [value per year]), ...] as from trends.focal_trend.
+    ``group`` names the comparison group in the legend.
+    """
+    years = list(rows.index)
+    x = np.arange(len(years))
+    fig, ax = new_figure()
+
+    ax.fill_between(x, rows['q10'], rows['q90'], color=COLORS[0], alpha=0.15, linewidth=0,
+                    label=f'{group} 10th-90th percentile')
+    ax.fill_between(x, rows['q25'], rows['q75'], color=COLORS[0], alpha=0.3, linewidth=0,
+                    label=f'{group} interquartile range')
+    ax.plot(x, rows['median'], color=COLORS[0], linewidth=2, label=f'{group} median')
+    ax.plot(x, rows['state'], color='black', linewidth=1, linestyle='--', label=trends.level_label(group))
+
+    for j, (district, values) in enumerate(focal):
+        y = [np.nan if v is None else v for v in values]
+        ax.plot(x, y, color=COLORS[(j + 1) % len(COLORS)], linewidth=2, marker='o',
+                linestyle=FOCAL_LINESTYLES[j % len(FOCAL_LINESTYLES)], label=district)
+
+    ax.set_xticks(x)
+    ax.set_xticklabels(years)
+    ax.set_ylabel(metric.xlabel)
+    ax.set_title(title or trends.trend_title(metric, population))
+    ax.set_ylim(*metric.xlim)
+    ax.legend(loc=metric.legend_loc)
+    return fig
+
+
+def encode_figure(fig, fmt='png'):
+    """Encode a figure to PNG/SVG bytes"""
+    buf = io.BytesIO()
+    fig.savefig(buf, format=fmt, **SAVEFIG_KWARGS)
+    return buf.getvalue()
+
+
+class FigureCache:
+    """LRU of encoded figures, bounded by the total size of the stored bytes
+
+    Keys are tuples such as (page, year, subject, data version); they must
+    change whenever anything drawn on the chart does.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, fmt='png'):
+        self.max_bytes = max_bytes
+        self.fmt = fmt
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Cached bytes for ``key`` or None"""
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._entries.move_to_end(key)
+            return data
+
+    def put(self, key, data):
+        """Store bytes under ``key``, evicting least recently used entries"""
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self._entries[key] = data
+            self.size += len(data)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def render(self, key, draw):
+        """Bytes for ``key``, calling ``draw()`` for a new figure only on a miss"""
+        data = self.get(key)
+        if data is None:
+            data = encode_figure(draw(), self.fmt)
+            self.put(key, data)
+        return data
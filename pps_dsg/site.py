@@ -0,0 +1,217 @@
+"""Static HTML export of every dashboard view.
+
+Readers who only look at the charts do not need a Streamlit session.
+``export_site`` writes one HTML page per dashboard page, holding the KDE
+chart (PNG) and the district-vs-State table of every year and subject, plus
+an index page, so the site can be served by any plain file server.
+
+Charts are rendered in parallel worker processes. ``manifest.json`` records
+the data version each chart was drawn from; charts whose version and focal
+districts are unchanged are not redrawn, and when nothing changed the export
+stops before computing anything. With a year-partitioned store only the
+years whose partitions changed are redrawn.
+
+    python export_static_site.py [--data final_merged_assess_demo_df.csv | --bundle FILE | --store DIR]
+"""
+import argparse
+import html
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from pps_dsg import bootstrap, bundle, cube, files, ingest, metrics, ranks, render, store, views
+
+SITE_DIR = "site"
+MANIFEST = "manifest.json"
+
+# Bump when the layout of the pages or charts changes
+SITE_FORMAT = 3
+
+CHART_DIR = "charts"
+
+
+def slug(text):
+    return re.sub(r'[^a-z0-9]+', '-', text.lower()).strip('-')
+
+
+def chart_path(metric, year):
+    """Chart file of one metric and year, relative to the site root"""
+    return f"{CHART_DIR}/{metric.key}_{year}.png"
+
+
+def _render_chart(task):
+    path, view, metric_key, year, focal = task
+    metric = metrics.METRICS[metric_key]
+    files.write_bytes(path, render.encode_figure(render.draw_view(view, metric, year, focal)))
+    return path
+
+
+class _Source:
+    """Views, rank table, summary cube, page years and per-year data versions the site is built from"""
+
+    def __init__(self, views_by_key, rank_table, summary_cube, version_of, years_of):
+        self.views = views_by_key
+        self.ranks = rank_table
+        self.cube = summary_cube
+        self.version_of = version_of
+        self.years_of = years_of
+
+    @classmethod
+    def from_bundle(cls, built):
+        return cls(built['views'], ranks.RankTable(built['ranks']), cube.SummaryCube(built['cube']),
+                   lambda year: built['data_version'], lambda page: list(page.years))
+
+    @classmethod
+    def from_store(cls, data_store):
+        partition_versions = data_store.versions()
+        derived = {year: data_store.derived(year) for year in partition_versions}
+        views_by_key = {
+            (source, year): part['views'][source]
+            for year, part in derived.items() for source in store.SOURCES
+        }
+        rank_table = ranks.RankTable(ranks.combine_frames(part['ranks'] for part in derived.values()))
+        summary_cube = cube.SummaryCube(cube.combine_frames(part['cube'] for part in derived.values()))
+        return cls(views_by_key, rank_table, summary_cube, partition_versions.get,
+                   lambda page: data_store.years(page.metrics))
+
+    def view(self, metric, year):
+        return self.views.get((metric.source, year), {}).get(metric.key) or views.empty_view()
+
+
+def read_manifest(output):
+    try:
+        with open(os.path.join(output, MANIFEST)) as fh:
+            manifest = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get('format') == SITE_FORMAT else None
+
+
+_STYLE = """
+body { font-family: sans-serif; max-width: 60rem; margin: 1rem auto; padding: 0 1rem; color: #222; }
+img { max-width: 100%; }
+table { border-collapse: collapse; margin: 0.5rem 0 2rem; }
+th, td { border: 1px solid #ccc; padding: 0.25rem 0.6rem; text-align: left; }
+nav a { margin-right: 1rem; }
+"""
+
+
+def _html_page(title, body, nav):
+    links = ''.join(f'<a href="{html.escape(href)}">{html.escape(label)}</a>' for label, href in nav)
+    return (f'<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>{html.escape(title)}</title>'
+            f'<style>{_STYLE}</style></head>\n<body><nav>{links}</nav>\n<h1>{html.escape(title)}</h1>\n'
+            f'{body}\n</body></html>\n')
+
+
+def _page_html(page, sections, nav):
+    body = [f'<p>{html.escape(page.description)}</p>']
+    years = list(dict.fromkeys(year for year, _, _, _ in sections))
+    body.append('<p>' + ' '.join(f'<a href="#{slug(year)}">{html.escape(year)}</a>' for year in years) + '</p>')
+    for year, metric, image, table in sections:
+        heading = f'{year}' + (f' - {metric.label}' if page.selector_label else '')
+        anchor = f' id="{slug(year)}"' if metric.key == page.metrics[0] else ''
+        body.append(f'<h2{anchor}>{html.escape(heading)}</h2>')
+        body.append(f'<img src="{html.escape(image)}" alt="{html.escape(metric.chart_title)}: {html.escape(year)}">')
+        body.append(table.to_html(index=False, border=0))
+    return _html_page(page.title, '\n'.join(body), nav)
+
+
+def export_site(output=SITE_DIR, data=ingest.DATA_PATH, bundle_path=None, store_dir=None,
+                districts=(views.PORTLAND,), workers=None, force=False):
+    """Write the static site to ``output``; returns {'drawn', 'skipped'} chart counts"""
+    districts = list(districts)
+    manifest = None if force else read_manifest(output)
+    if store_dir:
+        data_store = store.Store(store_dir)
+        input_version = store.combined_version(data_store.versions())
+    elif bundle_path:
+        input_version = bundle.read_bundle(bundle_path)['data_version']
+    else:
+        input_version = ingest.ensure_cache(data)[1]
+    unchanged = manifest and manifest['input_version'] == input_version and manifest['districts'] == districts
+    if unchanged and os.path.exists(os.path.join(output, 'index.html')):
+        return {'drawn': 0, 'skipped': len(manifest['charts'])}
+
+    if store_dir:
+        source = _Source.from_store(data_store)
+    elif bundle_path:
+        source = _Source.from_bundle(bundle.read_bundle(bundle_path))
+    else:
+        source = _Source.from_bundle(bundle.build_bundle(data, workers))
+
+    os.makedirs(os.path.join(output, CHART_DIR), exist_ok=True)
+    drawn = (manifest or {}).get('charts', {})
+    charts = {}
+    tasks = []
+    pages = {}
+    nav = [('Index', 'index.html')] + [(page.name, f'{slug(page.name)}.html') for page in metrics.PAGES.values()]
+    for page in metrics.PAGES.values():
+        sections = []
+        for year in reversed(source.years_of(page)):
+            for metric_key in page.metrics:
+                metric = metrics.METRICS[metric_key]
+                view = source.view(metric, year)
+                if not len(view['populations']):
+                    continue
+                image = chart_path(metric, year)
+                version = f"{source.version_of(year)}:{'|'.join(districts)}"
+                charts[image] = version
+                if drawn.get(image) != version or not os.path.exists(os.path.join(output, image)):
+                    focal = [(d, source.ranks.markers(metric.key, year, view['populations'], d)) for d in districts]
+                    tasks.append((os.path.join(output, image), view, metric.key, year, focal))
+                intervals = bootstrap.metric_year_intervals(source.ranks, metric.key, year, views.SUMMARY_GROUPS)
+                rows = views.comparison_rows(source.cube, source.ranks, metric.key, year, districts, intervals)
+                table = pd.DataFrame(views.format_comparison(rows, metric.formatter),
+                                     columns=views.comparison_columns(districts, intervals=True))
+                sections.append((year, metric, image, table))
+        pages[page] = sections
+
+    if tasks:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(_render_chart, tasks))
+
+    for page, sections in pages.items():
+        files.write_text(os.path.join(output, f'{slug(page.name)}.html'), _page_html(page, sections, nav))
+    index_body = '<ul>' + ''.join(
+        f'<li><a href="{slug(page.name)}.html">{html.escape(page.title)}</a> - {html.escape(page.description)}</li>'
+        for page in metrics.PAGES.values()) + '</ul>'
+    index_body += f'<p>Built {time.strftime("%Y-%m-%d %H:%M")} from data version {html.escape(input_version)}.</p>'
+    files.write_text(os.path.join(output, 'index.html'), _html_page("District Performance Dashboard", index_body, nav))
+
+    # Charts no longer part of the site
+    for image in set(drawn) - set(charts):
+        try:
+            os.remove(os.path.join(output, image))
+        except OSError:
+            pass
+    files.write_text(os.path.join(output, MANIFEST), json.dumps({
+        'format': SITE_FORMAT,
+        'input_version': input_version,
+        'districts': districts,
+        'charts': charts,
+    }, indent=1, sort_keys=True))
+    return {'drawn': len(tasks), 'skipped': len(charts) - len(tasks)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export every dashboard view as a static HTML site")
+    parser.add_argument('--output', default=SITE_DIR, help="directory to write the site to")
+    inputs = parser.add_mutually_exclusive_group()
+    inputs.add_argument('--data', default=ingest.DATA_PATH, help="merged assessment/demographics CSV")
+    inputs.add_argument('--bundle', help="precomputed bundle (build_dashboard_bundle.py) to export")
+    inputs.add_argument('--store', help="year-partitioned store (ingest_year.py) to export")
+    parser.add_argument('--district', action='append', dest='districts',
+                        help="focal district (repeat for several; default Portland Public Schools)")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument('--force', action='store_true', help="redraw every chart")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    counts = export_site(args.output, args.data, args.bundle, args.store,
+                         args.districts or [views.PORTLAND], args.workers, args.force)
+    print(f"Drew {counts['drawn']} charts, kept {counts['skipped']} unchanged, "
+          f"in {args.output} ({time.perf_counter() - start:.1f}s)")
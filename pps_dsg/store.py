@@ -0,0 +1,185 @@
+"""Year-partitioned store of the merged dataset.
+
+When the warehouse publishes a new school year, ``Store.append`` parses only
+that year's export and writes it as its own partition -- the typed rows
+(``<year>/rows.feather``) and everything the dashboard derives from them:
+the KDE views, the district rank rows and the summary cube rows of that year
+(``<year>/derived.pkl``). Other partitions are left untouched.
+
+``manifest.json`` records each partition's version (a hash of its rows) and
+the metrics it has data for. The app keys its caches by (year, partition
+version), so re-ingesting a year invalidates only that year's cache entries,
+and lists a page's years from the partitions that cover its metrics.
+
+    python ingest_year.py append export_2024-2025.csv [--store pps_dsg_store]
+    python ingest_year.py list
+"""
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import time
+
+import pandas as pd
+
+from pps_dsg import cube, files, ingest, metrics, ranks, views
+from pps_dsg.dataset import Dataset, achievement_index, metric_index
+
+STORE_DIR = "pps_dsg_store"
+MANIFEST = "manifest.json"
+
+# Bump when the layout of a partition or of its derived data changes
+STORE_FORMAT = 3
+
+SOURCES = ('rows', 'achievement')
+
+
+def partition_version(df):
+    """Content hash of a partition's typed rows and the registry that parsed them"""
+    digest = hashlib.sha256(str(STORE_FORMAT).encode())
+    digest.update(metrics.registry_signature().encode())
+    digest.update(','.join(df.columns).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()[:12]
+
+
+def combined_version(versions):
+    """One version string for a whole store, from its {year: version}"""
+    digest = hashlib.sha256(json.dumps(sorted(versions.items())).encode())
+    return digest.hexdigest()[:12]
+
+
+def derive(df, year):
+    """Views, rank rows and summary cube rows of one year's typed rows"""
+    data = Dataset(frame=df, version=df.attrs.get('data_version', ''))
+    indexes = {'rows': metric_index(data), 'achievement': achievement_index(data)}
+    sources = [(indexes[source], metrics.metrics_for_source(source)) for source in SOURCES]
+    rank_frame = ranks.rank_frame(sources)
+    return {
+        'views': {source: views.year_views(index, year, metric_list)
+                  for source, (index, metric_list) in zip(SOURCES, sources)},
+        'ranks': rank_frame,
+        'cube': cube.build_cube(sources, rank_frame),
+    }
+
+
+class Store:
+    """Directory of per-year partitions plus a manifest"""
+
+    def __init__(self, root=STORE_DIR):
+        self.root = root
+
+    def manifest(self):
+        """{'format': ..., 'partitions': {year: entry}}, empty for a new store"""
+        try:
+            with open(os.path.join(self.root, MANIFEST)) as fh:
+                manifest = json.load(fh)
+        except FileNotFoundError:
+            return {'format': STORE_FORMAT, 'partitions': {}}
+        if manifest.get('format') != STORE_FORMAT:
+            raise ValueError(f"{self.root} has store format {manifest.get('format')}, "
+                             f"expected {STORE_FORMAT}; re-ingest it")
+        return manifest
+
+    def _write_manifest(self, manifest):
+        os.makedirs(self.root, exist_ok=True)
+        files.write_text(os.path.join(self.root, MANIFEST), json.dumps(manifest, indent=1, sort_keys=True))
+
+    def versions(self):
+        """{year: partition version}"""
+        return {year: entry['version'] for year, entry in self.manifest()['partitions'].items()}
+
+    def years(self, metric_keys=None):
+        """Sorted partition years, optionally only those with data for any of ``metric_keys``"""
+        partitions = self.manifest()['partitions']
+        return sorted(
+            year for year, entry in partitions.items()
+            if metric_keys is None or set(metric_keys) & set(entry['metrics'])
+        )
+
+    def _path(self, year, name):
+        return os.path.join(self.root, str(year).replace(os.sep, '_'), name)
+
+    def derived(self, year):
+        """{'views': {source: {metric key: view}}, 'ranks': frame, 'cube': frame}"""
+        with open(self._path(year, 'derived.pkl'), 'rb') as fh:
+            return pickle.load(fh)
+
+    def write_partition(self, year, df, source=None):
+        """Store one year's typed rows and their derived data
+
+        Returns 'added', 'replaced' or 'unchanged' (same rows as stored).
+        """
+        df = df.reset_index(drop=True)
+        for col in df.select_dtypes('category').columns:
+            df[col] = df[col].cat.remove_unused_categories()
+        if ingest.SOURCE_ROW in df.columns:
+            # Order within the year, not position in the export, so the same
+            # rows from a different file keep their version
+            df[ingest.SOURCE_ROW] = df[ingest.SOURCE_ROW].rank(method='first').astype('int32') - 1
+        version = partition_version(df)
+        manifest = self.manifest()
+        current = manifest['partitions'].get(year)
+        if current and current['version'] == version:
+            return 'unchanged'
+
+        df.attrs['data_version'] = version
+        derived = derive(df, year)
+        os.makedirs(os.path.dirname(self._path(year, '')), exist_ok=True)
+        files.write_atomic(self._path(year, 'rows.feather'),
+                      lambda path: df.to_feather(path, compression='uncompressed'))
+        files.write_pickle(self._path(year, 'derived.pkl'), derived)
+
+        manifest['partitions'][year] = {
+            'version': version,
+            'rows': len(df),
+            'metrics': sorted(derived['ranks']['Metric'].unique()),
+            'source': source,
+            'updated': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        }
+        self._write_manifest(manifest)
+        return 'replaced' if current else 'added'
+
+    def append(self, path):
+        """Ingest a warehouse export (one or more years); {year: outcome}"""
+        df = ingest.parse_frame(ingest.read_source(path))
+        outcomes = {}
+        for year, part in df.groupby('Year', observed=True, sort=True):
+            outcomes[str(year)] = self.write_partition(str(year), part, source=os.path.basename(path))
+        return outcomes
+
+    def remove(self, year):
+        """Drop one partition"""
+        manifest = self.manifest()
+        if manifest['partitions'].pop(year, None) is None:
+            raise KeyError(year)
+        self._write_manifest(manifest)
+        shutil.rmtree(os.path.dirname(self._path(year, '')), ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the year-partitioned dashboard store")
+    parser.add_argument('--store', default=STORE_DIR, help="store directory")
+    commands = parser.add_subparsers(dest='command', required=True)
+    append = commands.add_parser('append', help="ingest one or more years from a merged export CSV")
+    append.add_argument('paths', nargs='+')
+    commands.add_parser('list', help="show the stored partitions")
+    remove = commands.add_parser('remove', help="drop a year's partition")
+    remove.add_argument('year')
+    args = parser.parse_args(argv)
+
+    store = Store(args.store)
+    if args.command == 'append':
+        for path in args.paths:
+            start = time.perf_counter()
+            for year, outcome in store.append(path).items():
+                print(f"{year}: {outcome}")
+            print(f"Ingested {path} in {time.perf_counter() - start:.1f}s")
+    elif args.command == 'list':
+        for year, entry in sorted(store.manifest()['partitions'].items()):
+            print(f"{year}  {entry['version']}  {entry['rows']:>8} rows  {entry['updated']}  {entry['source'] or ''}")
+    else:
+        store.remove(args.year)
+        print(f"Removed {args.year}")
@@ -0,0 +1,99 @@
+"""Lightweight per-rerun timing spans.
+
+Profiling is off unless the ``PPS_DSG_PROFILE`` environment variable is set
+or the page is opened with ``?profile=1``. When on, the app times its stages
+(data load, filtering, KDE fitting, chart rasterization, table rendering),
+shows them in a sidebar panel and appends one JSON line per rerun to
+``PPS_DSG_PROFILE_LOG`` (default perf_log.jsonl).
+
+One-off costs of the server process -- module imports, the first paint of
+the first session, the start-up cache warm-up -- are kept in ``STARTUP``
+whether or not profiling is on, and shown and logged next to the spans.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+ENV_VAR = "PPS_DSG_PROFILE"
+LOG_ENV_VAR = "PPS_DSG_PROFILE_LOG"
+DEFAULT_LOG = "perf_log.jsonl"
+QUERY_PARAM = "profile"
+
+_TRUE = {'1', 'true', 'yes', 'on'}
+
+_log_lock = threading.Lock()
+
+# {name: seconds} of one-off start-up costs, first measurement wins
+STARTUP = {}
+
+
+def record_startup(name, seconds):
+    STARTUP.setdefault(name, seconds)
+
+
+def startup_rows():
+    """[(name, milliseconds)] of the recorded start-up costs"""
+    return [(name, seconds * 1000) for name, seconds in STARTUP.items()]
+
+
+def enabled(query_params=None):
+    """True when profiling is switched on by env var or query parameter"""
+    if os.environ.get(ENV_VAR, '').lower() in _TRUE:
+        return True
+    return bool(query_params) and str(query_params.get(QUERY_PARAM, '')).lower() in _TRUE
+
+
+class RerunTimer:
+    """Named wall-clock spans for one script rerun; a disabled timer records nothing"""
+
+    def __init__(self, enabled=True, started=None):
+        self.enabled = enabled
+        self.started = time.perf_counter() if started is None else started
+        self.spans = {}
+
+    @contextmanager
+    def span(self, name):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.spans[name] = self.spans.get(name, 0.0) + time.perf_counter() - start
+
+    def add(self, name, seconds):
+        """Record a duration measured outside a span (e.g. imports before the timer existed)"""
+        if self.enabled:
+            self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def rows(self):
+        """[(stage, milliseconds)] in the order the spans were first entered, plus the rerun total"""
+        rows = [(name, seconds * 1000) for name, seconds in self.spans.items()]
+        return rows + [('rerun total', self.elapsed() * 1000)]
+
+    def record(self, path=None, **labels):
+        """Append this rerun's spans to a JSONL log, tagged with ``labels``"""
+        if not self.enabled:
+            return
+        path = path or os.environ.get(LOG_ENV_VAR, DEFAULT_LOG)
+        entry = {
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            **labels,
+            'total_ms': round(self.elapsed() * 1000, 3),
+            'spans_ms': {name: round(seconds * 1000, 3) for name, seconds in self.spans.items()},
+            'startup_ms': {name: round(ms, 3) for name, ms in startup_rows()},
+        }
+        line = json.dumps(entry) + '\n'
+        with _log_lock:
+            with open(path, 'a') as fh:
+                fh.write(line)
+
+
+# Shared no-op timer for code called without one
+NULL_TIMER = RerunTimer(enabled=False)
@@ -0,0 +1,37 @@
+"""Rows of the Trend view.
+
+Trend mode shows, for one population, how the statewide distribution of a
+metric moved over the years next to the focal districts' values. The
+statewide figures of every year come from the summary cube
+(``cube.SummaryCube.trend``) and the district values from the rank table,
+so a trend is a handful of lookups rather than one filter pass per year.
+
+The cube's ``state`` column is the warehouse's statewide figure, not a mean
+of the district values; for a peer group it is the peers' mean
+(cube.ranks_cube). ``level_label`` names it accordingly.
+"""
+import pandas as pd
+
+
+def level_label(group='State'):
+    """Label of the ``state`` series of a trend against ``group``"""
+    return 'Statewide' if group == 'State' else f'{group} mean'
+
+
+def trend_title(metric, population):
+    return f'{metric.label} by Year: {population}'
+
+
+def focal_trend(ranks, metric_key, population, years, district):
+    """A district's value in each of ``years`` (None where missing)"""
+    return [ranks.value(metric_key, year, population, district) for year in years]
+
+
+def trend_rows(rows, focal):
+    """[year, focal value per district ..., state, median, q25, q75] rows; None where missing"""
+    table = []
+    for i, (year, stats) in enumerate(rows.iterrows()):
+        state = [stats[c] for c in ('state', 'median', 'q25', 'q75')]
+        table.append([year] + [markers[i] for _, markers in focal]
+                     + [None if pd.isna(value) else float(value) for value in state])
+    return table
@@ -0,0 +1,158 @@
+"""Browser-rendered (Vega-Lite) versions of the dashboard charts.
+
+The matplotlib charts are rasterized on the server for every new selection
+and shipped as PNG. These charts instead send only the data: each KDE curve
+resampled to ``POINTS`` points over its support plus the focal-district
+markers, a few kilobytes of JSON that the browser draws with Vega-Lite.
+Axis ranges, colours, line styles and the legend follow render.py, and
+tooltips are evaluated client-side, so hovering needs no server round trip.
+"""
+import altair as alt
+import numpy as np
+import pandas as pd
+
+from pps_dsg import trends
+from pps_dsg.metrics import format_dollars
+from pps_dsg.render import COLORS
+
+# Points kept per KDE curve
+POINTS = 96
+
+# Chart size in pixels; the width stretches to the container
+HEIGHT = 320
+
+# Vega-Lite stroke dashes matching render.FOCAL_LINESTYLES
+FOCAL_DASHES = [[2, 3], [7, 4], [7, 3, 2, 3], [1, 5]]
+
+_LEGEND_ORIENT = {'upper right': 'top-right', 'upper left': 'top-left'}
+
+
+def _value_format(metric):
+    """d3 format string showing a value the way metric.formatter does"""
+    return '$,.0f' if metric.formatter is format_dollars else '.1f'
+
+
+def downsample(grid, density, points=POINTS):
+    """(x, y) of a curve resampled to ``points`` points over the part where it is defined"""
+    valid = np.isfinite(density)
+    if not valid.any():
+        return np.empty(0), np.empty(0)
+    lo, hi = grid[valid][0], grid[valid][-1]
+    x = np.linspace(lo, hi, points)
+    return x, np.interp(x, grid[valid], density[valid])
+
+
+def curve_frame(view, points=POINTS):
+    """Long frame (population, x, density) of a view's downsampled curves"""
+    parts = []
+    for pop, density in zip(view['populations'], view['densities']):
+        x, y = downsample(view['grid'], density, points)
+        if len(x):
+            parts.append(pd.DataFrame({'population': pop, 'x': x.round(3), 'density': y}))
+    if not parts:
+        return pd.DataFrame({'population': [], 'x': [], 'density': []})
+    frame = pd.concat(parts, ignore_index=True)
+    # Four significant digits are plenty on screen
+    frame['density'] = frame['density'].map(lambda v: float(f'{v:.4g}'))
+    return frame
+
+
+def marker_frame(populations, focal, metric):
+    """Long frame (district, population, value, label) of the focal markers"""
+    rows = [
+        (district, pop, value, metric.formatter(value))
+        for district, markers in focal
+        for pop, value in zip(populations, markers)
+        if value is not None
+    ]
+    return pd.DataFrame(rows, columns=['district', 'population', 'value', 'label'])
+
+
+def _focal_dash(districts):
+    return alt.StrokeDash(
+        'district:N', title='Focal district',
+        scale=alt.Scale(domain=list(districts),
+                        range=[FOCAL_DASHES[j % len(FOCAL_DASHES)] for j in range(len(districts))]),
+        legend=alt.Legend(symbolStrokeColor='black', symbolStrokeWidth=2) if districts else None,
+    )
+
+
+def view_chart(view, metric, year, focal=(), title=None):
+    """Layered Vega-Lite chart of one view: the KDE curves and a rule per focal marker"""
+    populations = list(view['populations'])
+    colour = alt.Color(
+        'population:N', title='Population',
+        scale=alt.Scale(domain=populations, range=[COLORS[i % len(COLORS)] for i in range(len(populations))]),
+        legend=alt.Legend(orient=_LEGEND_ORIENT.get(metric.legend_loc, 'right')),
+    )
+    x_scale = alt.Scale(domain=list(metric.xlim), nice=False)
+    fmt = _value_format(metric)
+
+    curves = alt.Chart(curve_frame(view)).mark_line(strokeWidth=2, clip=True).encode(
+        x=alt.X('x:Q', title=metric.xlabel, scale=x_scale),
+        y=alt.Y('density:Q', title='Density'),
+        color=colour,
+        tooltip=[alt.Tooltip('population:N', title='Population'),
+                 alt.Tooltip('x:Q', title=metric.label, format=fmt),
+                 alt.Tooltip('density:Q', title='Density', format='.4f')],
+    )
+    districts = [district for district, _ in focal]
+    markers = alt.Chart(marker_frame(populations, focal, metric)).mark_rule(strokeWidth=2, clip=True).encode(
+        x=alt.X('value:Q', scale=x_scale),
+        color=colour,
+        strokeDash=_focal_dash(districts),
+        tooltip=[alt.Tooltip('district:N', title='District'),
+                 alt.Tooltip('population:N', title='Population'),
+                 alt.Tooltip('label:N', title=metric.label)],
+    )
+    return (curves + markers).properties(title=title or f'{metric.chart_title}: {year}', height=HEIGHT)
+
+
+def trend_chart(rows, metric, population, focal=(), title=None, group='State'):
+    """Vega-Lite version of render.draw_trend"""
+    years = [str(year) for year in rows.index]
+    stats = rows.reset_index(names='year')
+    stats['year'] = stats['year'].astype(str)
+    y_scale = alt.Scale(domain=list(metric.xlim), nice=False)
+    x = alt.X('year:O', title=None, sort=years, axis=alt.Axis(labelAngle=0))
+    fmt = _value_format(metric)
+
+    outer = alt.Chart(stats).mark_area(opacity=0.15, color=COLORS[0]).encode(
+        x=x, y=alt.Y('q10:Q', title=metric.xlabel, scale=y_scale), y2='q90:Q')
+    inner = alt.Chart(stats).mark_area(opacity=0.3, color=COLORS[0]).encode(x=x, y='q25:Q', y2='q75:Q')
+    median = alt.Chart(stats).mark_line(color=COLORS[0], strokeWidth=2).encode(
+        x=x, y='median:Q',
+        tooltip=[alt.Tooltip('year:O', title='Year'),
+                 alt.Tooltip('median:Q', title=f'{group} median', format=fmt),
+                 alt.Tooltip('state:Q', title=trends.level_label(group), format=fmt),
+                 alt.Tooltip('q25:Q', title=f'{group} Q1', format=fmt),
+                 alt.Tooltip('q75:Q', title=f'{group} Q3', format=fmt)],
+    )
+    median_points = median.mark_point(color=COLORS[0], filled=True, size=30)
+    mean = alt.Chart(stats).mark_line(color='black', strokeWidth=1, strokeDash=[5, 3]).encode(x=x, y='state:Q')
+
+    districts = [district for district, _ in focal]
+    focal_rows = pd.DataFrame(
+        [(district, year, value, metric.formatter(value))
+         for district, values in focal for year, value in zip(years, values) if value is not None],
+        columns=['district', 'year', 'value', 'label'],
+    )
+    focal_colour = alt.Color(
+        'district:N', title='Focal district',
+        scale=alt.Scale(domain=districts,
+                        range=[COLORS[(j + 1) % len(COLORS)] for j in range(len(districts))]),
+        legend=alt.Legend(orient='right') if districts else None,
+    )
+    focal_lines = alt.Chart(focal_rows).mark_line(strokeWidth=2, point=True).encode(
+        x=x, y='value:Q', color=focal_colour, strokeDash=_focal_dash(districts),
+        tooltip=[alt.Tooltip('district:N', title='District'),
+                 alt.Tooltip('year:O', title='Year'),
+                 alt.Tooltip('label:N', title=metric.label)],
+    )
+    layers = outer + inner + median + median_points + mean + focal_lines
+    title = alt.TitleParams(
+        title or trends.trend_title(metric, population),
+        subtitle=f'{group} 10th-90th percentile and interquartile bands and median (solid); '
+                 f'{trends.level_label(group)} (dashed)',
+    )
+    return layers.properties(title=title, height=HEIGHT)
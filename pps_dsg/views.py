@@ -0,0 +1,153 @@
+"""Everything the dashboard shows, computed from a DataIndex.
+
+A view is the KDE curve of each population for one metric and year.
+Focal-district values are not part of a view; they are looked up in the rank
+table (ranks.py), and the statewide figures of the tables come from the
+summary cube (cube.py), so any district can be compared without recomputing
+anything.
+``year_views`` builds the views of every registered metric of a year from a
+single pass over that year's rows, so switching pages costs nothing and a
+new metric adds no extra scan. The app and the bundle builder share it.
+"""
+import numpy as np
+
+from pps_dsg import bootstrap, kde
+from pps_dsg.timing import NULL_TIMER
+
+PORTLAND = 'Portland Public Schools'
+
+SUMMARY_GROUPS = ["All Students", "Economically Disadvantaged", "Students with Disabilities"]
+
+
+def format_summary(rows, format_func):
+    """Format [label, value, ...] rows (e.g. trends.trend_rows) for display; None is 'N/A'"""
+    return [
+        [group] + [format_func(value) if value is not None else 'N/A' for value in values]
+        for group, *values in rows
+    ]
+
+
+def year_views(index, year, metric_list, timer=NULL_TIMER):
+    """{metric key: view} for every metric in ``metric_list`` in one year
+
+    The year's rows are cast once; per-population samples are then read off
+    that block by row range. ``timer`` (timing.RerunTimer) receives 'filter'
+    and 'kde' spans.
+    """
+    populations = index.levels['Population']
+    with timer.span('filter'):
+        offset, stop = index.bounds(year)
+        columns = list(dict.fromkeys(m.column for m in metric_list))
+        block = index.columns(columns).iloc[offset:stop].astype('float64')
+        position = {column: i for i, column in enumerate(columns)}
+
+        samples = {}
+        for pop in populations:
+            start, end = index.bounds(year, pop)
+            samples[pop] = block.iloc[start - offset:end - offset].to_numpy()
+
+    result = {}
+    for metric in metric_list:
+        col = position[metric.column]
+        with timer.span('kde'):
+            grid, densities = kde.density_curves([samples[pop][:, col] for pop in populations])
+        result[metric.key] = {
+            'populations': populations,
+            'grid': grid,
+            'densities': densities,
+        }
+    return result
+
+
+def empty_view():
+    """View with nothing to plot, for selections the data does not cover"""
+    return {
+        'populations': [],
+        'grid': np.linspace(0.0, 1.0, kde.GRIDSIZE),
+        'densities': np.empty((0, kde.GRIDSIZE)),
+    }
+
+
+def group_view(ranks, metric_key, year, populations):
+    """View of the district values in a rank table, one per district (e.g. a peer group)"""
+    grid, densities = kde.density_curves([ranks.group(metric_key, year, pop)[1] for pop in populations])
+    return {
+        'populations': list(populations),
+        'grid': grid,
+        'densities': densities,
+    }
+
+
+def freeze(view):
+    """Mark a view's arrays read-only so one copy can be shared by every session"""
+    for key in ('grid', 'densities'):
+        view[key].flags.writeable = False
+    return view
+
+
+def comparison_rows(cube, ranks, metric_key, year, districts, intervals=None, groups=SUMMARY_GROUPS):
+    """[group, (value, percentile, band) per district ..., state, (mean, interval), (count, suppressed)] rows
+
+    ``cube`` is a cube.SummaryCube and ``ranks`` a ranks.RankTable (or the
+    pair for a peer group, see peers.py). With
+    ``intervals`` (from bootstrap.metric_year_intervals) each district gets
+    its bootstrap percentile band and the mean district value its confidence
+    interval; without them both are None. Missing values are None.
+    """
+    rows = []
+    for group in groups:
+        stats = cube.lookup(metric_key, year, group) or {}
+        boot = (intervals or {}).get(group, {})
+        row = [group]
+        for district in districts:
+            found = ranks.lookup(metric_key, year, group, district)
+            band = boot.get('bands', {}).get(district)
+            row.append((found['value'], found['percentile'], band) if found else (None, None, None))
+        row.append(stats.get('state'))
+        row.append((stats.get('mean'), boot.get('mean')))
+        suppressed = stats.get('suppressed')
+        row.append((int(stats.get('count') or 0), None if suppressed is None else int(suppressed)))
+        rows.append(row)
+    return rows
+
+
+def comparison_columns(districts, intervals=False, group="State"):
+    """Column names of format_comparison rows; ``group`` names the comparison group"""
+    columns = ["Population"]
+    band = f" ({bootstrap.LEVEL}% band)" if intervals else ""
+    for district in districts:
+        columns += [district, f"{district} Percentile{band}"]
+    columns.append(group)
+    columns.append(f"District Mean ({bootstrap.LEVEL}% CI)" if intervals else "District Mean")
+    columns.append("Districts (Suppressed)" if group == "State" else "Districts")
+    return columns
+
+
+def _format_range(low, high, format_func):
+    return f"{format_func(low)}-{format_func(high)}"
+
+
+def format_comparison(rows, format_func):
+    """Format comparison_rows for display: value and percentile columns per district, then the state columns"""
+    formatted = []
+    for row in rows:
+        group, *focal, state_val, (mean, interval), (count, suppressed) = row
+        out = [group]
+        for value, percentile, band in focal:
+            out.append(format_func(value) if value is not None else 'N/A')
+            if percentile is None:
+                out.append('N/A')
+            elif band is None:
+                out.append(f"{percentile:.0f}")
+            else:
+                out.append(f"{percentile:.0f} ({_format_range(*band, lambda v: f'{v:.0f}')})")
+        out.append(format_func(state_val) if state_val is not None else 'N/A')
+        if mean is None:
+            out.append('N/A')
+        elif interval is None:
+            out.append(format_func(mean))
+        else:
+            out.append(f"{format_func(mean)} ({_format_range(*interval, format_func)})")
+        out.append(f"{count}" if suppressed is None else f"{count} ({suppressed})")
+        formatted.append(out)
+    return formatted
@@ -1,28 +1,19 @@
+import time
+
+# Cold-start report: how long imports and the first paint take (see timing.STARTUP)
+script_started = time.perf_counter()
+
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-import numpy as np
-import seaborn as sns
-from matplotlib.lines import Line2D
 
+from pps_dsg import loaders, metrics, peers, render, timing, trends, views
 
-# Add this global font setting here:
-plt.rcParams.update({
-    'font.size': 10,           # General font size
-    'axes.titlesize': 12,      # Title font size
-    'axes.labelsize': 10,      # Axis label font size
-    'xtick.labelsize': 9,      # X-axis tick label size
-    'ytick.labelsize': 9,      # Y-axis tick label size
-    'legend.fontsize': 9       # Legend font size
-})
+imports_done = time.perf_counter()
+timing.record_startup('app imports', imports_done - script_started)
 
-# Configure Streamlit page - side panel always open
-st.set_page_config(
-    page_title="District Performance Dashboard", 
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
-#end of added global settings
+# Stage timings for this rerun; only recorded with PPS_DSG_PROFILE=1 or ?profile=1
+timer = timing.RerunTimer(enabled=timing.enabled(st.query_params), started=script_started)
+timer.add('imports', imports_done - script_started)
 
 # Configure Streamlit page - side panel always open
 st.set_page_config(
@@ -64,472 +55,179 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Load data
-@st.cache_data
-def load_data():
-    return pd.read_csv("final_merged_assess_demo_df.csv", low_memory=False)
-
-full_df = load_data()
-
-# Define consistent colors (matplotlib default colors)
-COLORS = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b', '#e377c2', '#7f7f7f', '#bcbd22', '#17becf']
-
-# Sidebar for navigation
+# Sidebar for navigation, drawn before any data is loaded
 st.sidebar.title("Dashboard Navigation")
-page = st.sidebar.selectbox("Select Analysis", [
-    "Chronic Absenteeism", 
-    "Per Pupil Spending", 
-    "4-Year Graduation Rate",
-    "5/6-Year Graduation Rate",
-    "Academic Achievement"
-])
-
-# Helper function to create seaborn KDE plot
-def create_kde_plot(data, ax, label, color):
-    """Create KDE plot using seaborn"""
-    if len(data) > 0:
-        sns.kdeplot(data, label=label, ax=ax, color=color, linewidth=2)
-        return color
-    return None
-
-# Helper function to create summary table
-def create_summary_table(df, year, metric_col, statewide_col, groups, format_func):
-    table_data = []
-    for group in groups:
-        portland_val = df[
-            (df['Year'] == year) &
-            (df['District Name'] == 'Portland Public Schools') &
-            (df['Population'] == group)
-        ][metric_col]
-        
-        if portland_val.dtype == 'object':
-            portland_val = pd.to_numeric(portland_val.str.replace('%', '').str.replace(',', ''), errors='coerce').dropna()
-        else:
-            portland_val = pd.to_numeric(portland_val, errors='coerce').dropna()
-
-        state_val = df[
-            (df['Year'] == year) &
-            (df['Population'] == group)
-        ][statewide_col]
-        
-        if state_val.dtype == 'object':
-            state_val = pd.to_numeric(state_val.str.replace('%', '').str.replace(',', ''), errors='coerce').dropna()
-        else:
-            state_val = pd.to_numeric(state_val, errors='coerce').dropna()
-
-        table_data.append([
-            group,
-            format_func(portland_val.iloc[0]) if not portland_val.empty else 'N/A',
-            format_func(state_val.mean()) if not state_val.empty else 'N/A'
-        ])
-    return table_data
-
-# Chronic Absenteeism Page
-if page == "Chronic Absenteeism":
-    st.title("Chronic Absenteeism Analysis")
-    st.write("Distribution of chronic absenteeism rates across Maine school districts")
-    
-    years = ["2017-2018", "2018-2019", "2019-2020", "2020-2021", "2021-2022", "2022-2023", "2023-2024"]
-    selected_year = st.radio("Select Year", years, index=6, horizontal=True)
-    
-    fig, ax = plt.subplots(figsize=(7, 3.5))
-    
-    for i, pop in enumerate(full_df['Population'].unique()):
-        data = full_df[
-            (full_df['Year'] == selected_year) &
-            (full_df['Population'] == pop)
-        ]['Percentage of Students Chronically Absent']
-        data = pd.to_numeric(data.str.replace('%', ''), errors='coerce').dropna()
-        
-        if not data.empty:
-            color = create_kde_plot(data, ax, pop, COLORS[i % len(COLORS)])
-            
-            # Add Portland line
-            portland_val = full_df[
-                (full_df['Year'] == selected_year) &
-                (full_df['Population'] == pop) &
-                (full_df['District Name'] == 'Portland Public Schools')
-            ]['Percentage of Students Chronically Absent']
-            portland_val = pd.to_numeric(portland_val.str.replace('%', ''), errors='coerce').dropna()
-            
-            if not portland_val.empty:
-                ax.axvline(portland_val.iloc[0], color=COLORS[i % len(COLORS)], linestyle=':', linewidth=2)
-
-    ax.set_xlabel('Percentage of Students Chronically Absent')
-    ax.set_ylabel('Density')
-    ax.set_title(f'Statewide Distribution of Chronic Absenteeism: {selected_year}')
-    ax.set_xlim(0, 90)
-    
-    # Add legend
-    dotted_line_legend = Line2D([], [], color='black', linestyle=':', linewidth=2, label='Portland Public Schools')
-    handles, labels = ax.get_legend_handles_labels()
-    handles.append(dotted_line_legend)
-    labels.append('Portland Public Schools')
-    ax.legend(handles, labels, title="Population", loc='upper right')
-    
-    st.pyplot(fig)
-    
-    # Summary table
-    groups = ["All Students", "Economically Disadvantaged", "Students with Disabilities"]
-    table_data = create_summary_table(
-        full_df, selected_year, 
-        'Percentage of Students Chronically Absent', 
-        'Statewide - Percentage of Students Chronically Absent',
-        groups, 
-        lambda x: f"{x:.1f}%"
-    )
-    
-    st.subheader("Portland vs State Comparison")
-    df_table = pd.DataFrame(table_data, columns=["Population", "Portland", "State"])
-    st.table(df_table)
-
-# Per Pupil Spending Page
-elif page == "Per Pupil Spending":
-    st.title("Per Pupil Spending Analysis")
-    st.write("Distribution of per pupil spending across Maine school districts")
-    
-    years = ["2017-2018", "2018-2019", "2019-2020", "2020-2021", "2021-2022", "2022-2023", "2023-2024"]
-    selected_year = st.radio("Select Year", years, index=6, horizontal=True)
-    
-    fig, ax = plt.subplots(figsize=(7, 3.5))
-    
-    for i, pop in enumerate(full_df['Population'].unique()):
-        data = full_df[
-            (full_df['Year'] == selected_year) &
-            (full_df['Population'] == pop)
-        ]['Per Pupil Amount']
-        data = pd.to_numeric(data.str.replace(',', ''), errors='coerce').dropna()
-        
-        if not data.empty:
-            color = create_kde_plot(data, ax, pop, COLORS[i % len(COLORS)])
-            
-            # Add Portland line
-            portland_val = full_df[
-                (full_df['Year'] == selected_year) &
-                (full_df['Population'] == pop) &
-                (full_df['District Name'] == 'Portland Public Schools')
-            ]['Per Pupil Amount']
-            portland_val = pd.to_numeric(portland_val.str.replace(',', ''), errors='coerce').dropna()
-            
-            if not portland_val.empty:
-                ax.axvline(portland_val.iloc[0], color=COLORS[i % len(COLORS)], linestyle=':', linewidth=2)
-
-    ax.set_xlabel('Per Pupil Amount ($)')
-    ax.set_ylabel('Density')
-    ax.set_title(f'Statewide Distribution of Per Pupil Spending: {selected_year}')
-    ax.set_xlim(5000, 35000)
-    
-    # Add legend
-    dotted_line_legend = Line2D([], [], color='black', linestyle=':', linewidth=2, label='Portland Public Schools')
-    handles, labels = ax.get_legend_handles_labels()
-    handles.append(dotted_line_legend)
-    labels.append('Portland Public Schools')
-    ax.legend(handles, labels, title="Population", loc='upper right')
-    
-    st.pyplot(fig)
-    
-    # Summary table
-    groups = ["All Students", "Economically Disadvantaged", "Students with Disabilities"]
-    table_data = create_summary_table(
-        full_df, selected_year, 
-        'Per Pupil Amount', 
-        'Statewide Per Pupil',
-        groups, 
-        lambda x: f"${x:,.0f}"
-    )
-    
-    st.subheader("Portland vs State Comparison")
-    df_table = pd.DataFrame(table_data, columns=["Population", "Portland", "State"])
-    st.table(df_table)
-
-# 4-Year Graduation Rate Page
-elif page == "4-Year Graduation Rate":
-    st.title("4-Year Graduation Rate Analysis")
-    st.write("Distribution of 4-year graduation rates across Maine school districts")
-    
-    years = ["2017-2018", "2018-2019", "2019-2020", "2020-2021", "2021-2022", "2022-2023", "2023-2024"]
-    selected_year = st.radio("Select Year", years, index=6, horizontal=True)
-
-    fig, ax = plt.subplots(figsize=(7, 3.5))
-    
-    for i, pop in enumerate(full_df['Population'].unique()):
-        data = full_df[
-            (full_df['Year'] == selected_year) &
-            (full_df['Population'] == pop)
-        ]['Four Year Graduation Rate']
-        
-        if data.dtype == 'object':
-            data = pd.to_numeric(data.str.replace('%', ''), errors='coerce').dropna()
-        else:
-            data = pd.to_numeric(data, errors='coerce').dropna()
-        
-        if not data.empty:
-            color = create_kde_plot(data, ax, pop, COLORS[i % len(COLORS)])
-            
-            # Add Portland line
-            portland_val = full_df[
-                (full_df['Year'] == selected_year) &
-                (full_df['Population'] == pop) &
-                (full_df['District Name'] == 'Portland Public Schools')
-            ]['Four Year Graduation Rate']
-            
-            if portland_val.dtype == 'object':
-                portland_val = pd.to_numeric(portland_val.str.replace('%', ''), errors='coerce').dropna()
-            else:
-                portland_val = pd.to_numeric(portland_val, errors='coerce').dropna()
-                
-            if not portland_val.empty:
-                ax.axvline(portland_val.iloc[0], color=COLORS[i % len(COLORS)], linestyle=':', linewidth=2)
-
-    ax.set_xlabel('Four Year Graduation Rate (%)')
-    ax.set_ylabel('Density')
-    ax.set_title(f'Statewide Distribution of Four Year Graduation Rates: {selected_year}')
-    ax.set_xlim(20, 100)
-    
-    # Add legend
-    dotted_line_legend = Line2D([], [], color='black', linestyle=':', linewidth=2, label='Portland Public Schools')
-    handles, labels = ax.get_legend_handles_labels()
-    handles.append(dotted_line_legend)
-    labels.append('Portland Public Schools')
-    ax.legend(handles, labels, title="Population", loc='upper left')
-    
-    st.pyplot(fig)
-    
-    # Summary table
-    groups = ["All Students", "Economically Disadvantaged", "Students with Disabilities"]
-    table_data = create_summary_table(
-        full_df, selected_year, 
-        'Four Year Graduation Rate', 
-        'Four Year Statewide Graduation Rate',
-        groups, 
-        lambda x: f"{x:.1f}%"
-    )
-    
-    st.subheader("Portland vs State Comparison")
-    df_table = pd.DataFrame(table_data, columns=["Population", "Portland", "State"])
-    st.table(df_table)
-
-# 5/6-Year Graduation Rate Page
-elif page == "5/6-Year Graduation Rate":
-    st.title("5/6-Year Graduation Rate Analysis")
-    st.write("Distribution of 5/6-year graduation rates across Maine school districts")
-    
-    years = ["2017-2018", "2018-2019", "2019-2020", "2020-2021", "2021-2022", "2022-2023", "2023-2024"]
-    selected_year = st.radio("Select Year", years, index=6, horizontal=True)
-    
-    fig, ax = plt.subplots(figsize=(7, 3.5))
-    
-    for i, pop in enumerate(full_df['Population'].unique()):
-        data = full_df[
-            (full_df['Year'] == selected_year) &
-            (full_df['Population'] == pop)
-        ]['Five/Six Year Graduation Rate']
-        
-        if data.dtype == 'object':
-            data = pd.to_numeric(data.str.replace('%', ''), errors='coerce').dropna()
-        else:
-            data = pd.to_numeric(data, errors='coerce').dropna()
-        
-        if not data.empty:
-            color = create_kde_plot(data, ax, pop, COLORS[i % len(COLORS)])
-            
-            # Add Portland line
-            portland_val = full_df[
-                (full_df['Year'] == selected_year) &
-                (full_df['Population'] == pop) &
-                (full_df['District Name'] == 'Portland Public Schools')
-            ]['Five/Six Year Graduation Rate']
-            
-            if portland_val.dtype == 'object':
-                portland_val = pd.to_numeric(portland_val.str.replace('%', ''), errors='coerce').dropna()
-            else:
-                portland_val = pd.to_numeric(portland_val, errors='coerce').dropna()
-                
-            if not portland_val.empty:
-                ax.axvline(portland_val.iloc[0], color=COLORS[i % len(COLORS)], linestyle=':', linewidth=2)
-
-    ax.set_xlabel('Five/Six Year Graduation Rate (%)')
-    ax.set_ylabel('Density')
-    ax.set_title(f'Statewide Distribution of Five/Six Year Graduation Rates: {selected_year}')
-    ax.set_xlim(30, 100)
-    
-    # Add legend
-    dotted_line_legend = Line2D([], [], color='black', linestyle=':', linewidth=2, label='Portland Public Schools')
-    handles, labels = ax.get_legend_handles_labels()
-    handles.append(dotted_line_legend)
-    labels.append('Portland Public Schools')
-    ax.legend(handles, labels, title="Population", loc='upper left')
-    
-    st.pyplot(fig)
-    
-    # Summary table
-    groups = ["All Students", "Economically Disadvantaged", "Students with Disabilities"]
-    table_data = create_summary_table(
-        full_df, selected_year, 
-        'Five/Six Year Graduation Rate', 
-        'Five/Six Year Statewide Graduation Rate',
-        groups, 
-        lambda x: f"{x:.1f}%"
-    )
-    
-    st.subheader("Portland vs State Comparison")
-    df_table = pd.DataFrame(table_data, columns=["Population", "Portland", "State"])
-    st.table(df_table)
+page = st.sidebar.selectbox("Select Analysis", list(metrics.PAGES))
+view_mode = st.sidebar.radio("View", ["Single Year", "Trend"], horizontal=True)
+trend_mode = view_mode == "Trend"
+# Static: PNG drawn on the server. Interactive: curve points drawn by the browser
+renderer = st.sidebar.radio("Charts", ["Static", "Interactive"], horizontal=True)
+# State: every district. Similar Districts: the focal district's nearest peers
+comparison = st.sidebar.radio("Compare Against", ["State", "Similar Districts"], horizontal=True)
+peer_count = st.sidebar.slider("Number of Peers", 3, 30, peers.K) if comparison == "Similar Districts" else None
+
+# Page engine: every page is a registry entry (pps_dsg/metrics.py)
+page_spec = metrics.PAGES[page]
+st.title(page_spec.title)
+st.write(page_spec.description)
+first_paint = time.perf_counter() - script_started
+timing.record_startup('first paint', first_paint)
+timer.add('first paint', first_paint)
+
+# Data and the default view load in the background (already started by serve.py)
+loaders.start_warmup()
+
+with timer.span('load_data'):
+    partition_versions, data_version = loaders.data_versions()
+    partitions = tuple(sorted(partition_versions.items()))
+
+# Focal districts: marker lines on the chart and columns in the table
+with timer.span('ranks'):
+    rank_table = loaders.load_ranks(data_version, partitions)
+with timer.span('cube'):
+    summary_cube = loaders.load_cube(data_version, partitions)
+district_options = rank_table.districts()
+focal_districts = st.sidebar.multiselect(
+    "Focal District(s)", district_options,
+    default=[views.PORTLAND] if views.PORTLAND in district_options else district_options[:1],
+    max_selections=len(render.FOCAL_LINESTYLES),
+)
 
-# Academic Achievement Page
-elif page == "Academic Achievement":
-    st.title("Academic Achievement Analysis")
-    st.write("Students performing at or above state expectations")
-    
-    years = ["2015-2016", "2016-2017", "2017-2018", "2018-2019", "2022-2023", "2023-2024"]
-    subjects = ['ELA', 'Math', 'Science']
-    
+# With a store, a page lists every ingested year that has data for its metrics
+years = loaders.page_years(page_spec)
+if not years:
+    st.warning("No data has been ingested for this page yet.")
+    st.stop()
+populations = rank_table.index.levels['Population']
+
+# Single year: pick a year. Trend: every year of the page for one population
+def select_year_or_population():
+    if trend_mode:
+        default = populations.index("All Students") if "All Students" in populations else 0
+        return st.selectbox("Select Population", populations, index=default)
+    return st.radio("Select Year", years, index=len(years) - 1, horizontal=True)
+
+if page_spec.selector_label:
     col1, col2 = st.columns(2)
     with col1:
-        selected_year = st.radio("Select Year", years, index=5, horizontal=True)
+        selection = select_year_or_population()
     with col2:
-        selected_subject = st.selectbox("Select Subject", subjects)
-    
-    fig, ax = plt.subplots(figsize=(7, 3.5))
-    
-    # Filter for achievement levels to combine
-    at_or_above_df = full_df[full_df['Achievement Level'] == 'At or Above State Expectations']
-    at_df = full_df[full_df['Achievement Level'] == 'At State Expectations']
-    above_df = full_df[full_df['Achievement Level'] == 'Above State Expectations']
-    filtered_df = pd.concat([at_or_above_df, at_df, above_df], ignore_index=True)
-    
-    subject_column = f'Percentage of Students at Achievement Level_{selected_subject}'
-    
-    for i, pop in enumerate(filtered_df['Population'].unique()):
-        pop_year_data = filtered_df[
-            (filtered_df['Year'] == selected_year) &
-            (filtered_df['Population'] == pop)
-        ]
-        
-        # Aggregate by district
-        combined_data = []
-        for district in pop_year_data['District Name'].unique():
-            district_data = pop_year_data[pop_year_data['District Name'] == district]
-            total_pct = 0
-            count = 0
-            
-            for _, row in district_data.iterrows():
-                val = row[subject_column]
-                if pd.notna(val) and val != '*':
-                    if isinstance(val, str):
-                        numeric_val = pd.to_numeric(val.replace('%', ''), errors='coerce')
-                    else:
-                        numeric_val = pd.to_numeric(val, errors='coerce')
-                    
-                    if pd.notna(numeric_val):
-                        total_pct += numeric_val
-                        count += 1
-            
-            if count > 0:
-                combined_data.append(total_pct)
-        
-        if combined_data:
-            data = pd.Series(combined_data)
-            color = create_kde_plot(data, ax, pop, COLORS[i % len(COLORS)])
-            
-            # Add Portland line
-            portland_data = pop_year_data[pop_year_data['District Name'] == 'Portland Public Schools']
-            portland_total = 0
-            portland_count = 0
-            
-            for _, row in portland_data.iterrows():
-                val = row[subject_column]
-                if pd.notna(val) and val != '*':
-                    if isinstance(val, str):
-                        numeric_val = pd.to_numeric(val.replace('%', ''), errors='coerce')
-                    else:
-                        numeric_val = pd.to_numeric(val, errors='coerce')
-                    
-                    if pd.notna(numeric_val):
-                        portland_total += numeric_val
-                        portland_count += 1
-            
-            if portland_count > 0:
-                ax.axvline(portland_total, color=COLORS[i % len(COLORS)], linestyle=':', linewidth=2)
-
-    ax.set_xlabel(f'{selected_subject} Achievement - At or Above State Expectations (%)')
-    ax.set_ylabel('Density')
-    ax.set_title(f'Statewide Distribution of {selected_subject} Achievement: {selected_year}')
-    ax.set_xlim(0, 100)
-    
-    # Add legend
-    dotted_line_legend = Line2D([], [], color='black', linestyle=':', linewidth=2, label='Portland Public Schools')
-    handles, labels = ax.get_legend_handles_labels()
-    handles.append(dotted_line_legend)
-    labels.append('Portland Public Schools')
-    ax.legend(handles, labels, title="Population", loc='upper right')
-    
-    st.pyplot(fig)
-    
-    # Summary table for achievement
-    groups = ["All Students", "Economically Disadvantaged", "Students with Disabilities"]
-    table_data = []
-    
-    for group in groups:
-        # Portland combined value
-        portland_data = filtered_df[
-            (filtered_df['Year'] == selected_year) &
-            (filtered_df['District Name'] == 'Portland Public Schools') &
-            (filtered_df['Population'] == group)
-        ]
-        
-        portland_total = 0
-        portland_count = 0
-        for _, row in portland_data.iterrows():
-            val = row[subject_column]
-            if pd.notna(val) and val != '*':
-                if isinstance(val, str):
-                    numeric_val = pd.to_numeric(val.replace('%', ''), errors='coerce')
-                else:
-                    numeric_val = pd.to_numeric(val, errors='coerce')
-                
-                if pd.notna(numeric_val):
-                    portland_total += numeric_val
-                    portland_count += 1
-
-        # State average of combined values
-        group_data = filtered_df[
-            (filtered_df['Year'] == selected_year) &
-            (filtered_df['Population'] == group)
-        ]
-        
-        district_totals = []
-        for district in group_data['District Name'].unique():
-            district_data = group_data[group_data['District Name'] == district]
-            district_total = 0
-            district_count = 0
-            
-            for _, row in district_data.iterrows():
-                val = row[subject_column]
-                if pd.notna(val) and val != '*':
-                    if isinstance(val, str):
-                        numeric_val = pd.to_numeric(val.replace('%', ''), errors='coerce')
-                    else:
-                        numeric_val = pd.to_numeric(val, errors='coerce')
-                    
-                    if pd.notna(numeric_val):
-                        district_total += numeric_val
-                        district_count += 1
-            
-            if district_count > 0:
-                district_totals.append(district_total)
-
-        table_data.append([
-            group,
-            f"{portland_total:.1f}%" if portland_count > 0 else 'N/A',
-            f"{pd.Series(district_totals).mean():.1f}%" if district_totals else 'N/A'
-        ])
-    
-    st.subheader("Portland vs State Comparison")
-    df_table = pd.DataFrame(table_data, columns=["Population", "Portland", "State"])
+        metric_key = st.selectbox(page_spec.selector_label, page_spec.metrics,
+                                  format_func=lambda key: metrics.METRICS[key].label)
+        metric = metrics.METRICS[metric_key]
+else:
+    selection = select_year_or_population()
+    metric = metrics.METRICS[page_spec.metrics[0]]
+
+# Similar Districts: the first focal district and its nearest peers on the
+# multi-metric profile of the selected year (the latest year in Trend view),
+# ranked and summarized among themselves; charts and tables use that group
+compare_ranks, compare_cube, group_label, peer_group, chart_title = rank_table, summary_cube, "State", (), None
+if peer_count and not focal_districts:
+    st.info("Pick a focal district to compare it with similar districts.")
+elif peer_count:
+    focal_districts = focal_districts[:1]
+    profile_year = years[-1] if trend_mode else selection
+    with timer.span('peers'):
+        peer_index = loaders.load_peer_index(
+            profile_year, partition_versions.get(profile_year, data_version), rank_table)
+        neighbours = peer_index.neighbours(focal_districts[0], peer_count)
+    if neighbours:
+        peer_group = tuple([focal_districts[0]] + [district for district, _ in neighbours])
+        compare_ranks, compare_cube = loaders.load_peer_group(data_version, partitions, peer_group, focal_districts[0])
+        group_label = "Peers"
+        chart_title = f"{metric.label}: {focal_districts[0]} and {len(neighbours)} Similar Districts"
+        profile = ', '.join(metrics.METRICS[key].label for key in peer_index.metrics)
+        st.caption(f"Peers of {focal_districts[0]} on their {profile_year} {peers.PROFILE_POPULATION} profile "
+                   f"({profile}), nearest first: "
+                   + ', '.join(f"{district} ({distance:.2f})" for district, distance in neighbours))
+    else:
+        st.info(f"{focal_districts[0]} has no {profile_year} profile to find similar districts; "
+                "comparing against the State.")
+
+if trend_mode:
+    selected_population = selection
+    with timer.span('trend'):
+        trend = compare_cube.trend(metric.key, selected_population, years)
+    focal = [
+        (district, trends.focal_trend(compare_ranks, metric.key, selected_population, years, district))
+        for district in focal_districts
+    ]
+    title = chart_title and f"{chart_title}: {selected_population}"
+
+    def draw_chart():
+        return render.draw_trend(trend, metric, selected_population, focal, title, group_label)
+
+    def vega_chart():
+        return vega.trend_chart(trend, metric, selected_population, focal, title, group_label)
+
+    chart_key = ('trend', metric.key, selected_population, tuple(focal_districts), peer_group, data_version)
+    table_data = views.format_summary(trends.trend_rows(trend, focal), metric.formatter)
+    table_title = f"{selected_population}: {' / '.join(focal_districts) or group_label} by Year"
+    table_columns = (["Year"] + focal_districts + [trends.level_label(group_label).title()]
+                     + [f"{group_label} {stat}" for stat in ("Median", "Q1", "Q3")])
+else:
+    selected_year = selection
+    year_version = partition_versions.get(selected_year, data_version)
+    view = loaders.load_view(metric, selected_year, year_version, timer)
+    if peer_group:
+        # The peers' own distributions, coloured in the statewide population order
+        with timer.span('kde'):
+            view = views.group_view(compare_ranks, metric.key, selected_year, view['populations'])
+    title = chart_title and f"{chart_title}: {selected_year}"
+
+    focal = [
+        (district, compare_ranks.markers(metric.key, selected_year, view['populations'], district))
+        for district in focal_districts
+    ]
+
+    def draw_chart():
+        return render.draw_view(view, metric, selected_year, focal, title)
+
+    def vega_chart():
+        return vega.view_chart(view, metric, selected_year, focal, title)
+
+    chart_key = (metric.key, selected_year, tuple(focal_districts), peer_group, year_version)
+
+    # Summary table: each focal district's value and statewide percentile with
+    # its bootstrap band, then the cube's state mean, mean district value (with
+    # its bootstrap CI) and district counts
+    with timer.span('bootstrap'):
+        intervals = loaders.comparison_intervals(metric.key, selected_year, year_version, compare_ranks, peer_group)
+    table_data = views.format_comparison(
+        views.comparison_rows(compare_cube, compare_ranks, metric.key, selected_year, focal_districts, intervals),
+        metric.formatter)
+    table_title = f"{' / '.join(focal_districts) or 'District'} vs {group_label} Comparison"
+    table_columns = views.comparison_columns(focal_districts, intervals=True, group=group_label)
+
+if renderer == "Interactive":
+    with timer.span('vega'):
+        # altair is imported only once someone asks for an interactive chart
+        from pps_dsg import vega
+        chart = vega_chart()
+    st.altair_chart(chart, width="stretch")
+else:
+    with timer.span('rasterize'):
+        chart = loaders.figure_cache().render(chart_key, draw_chart)
+    st.image(chart, width="stretch")
+
+st.subheader(table_title)
+df_table = pd.DataFrame(table_data, columns=table_columns)
+with timer.span('table'):
     st.table(df_table)
 
 # Footer
 st.sidebar.markdown("---")
 st.sidebar.markdown("**Dashboard for District Decision Makers**")
-st.sidebar.markdown("Compare Portland Public Schools performance against statewide distributions")
\ No newline at end of file
+st.sidebar.markdown("Compare district performance against statewide distributions")
+
+# Hidden performance panel
+if timer.enabled:
+    with st.sidebar.expander("Performance (this rerun)", expanded=True):
+        st.table(pd.DataFrame(timer.rows(), columns=["Stage", "ms"]).round(1))
+    with st.sidebar.expander("Start-up (this server)"):
+        st.table(pd.DataFrame(timing.startup_rows(), columns=["Stage", "ms"]).round(1))
+    timer.record(page=page, mode=view_mode,
+                 year=None if trend_mode else selection,
+                 population=selection if trend_mode else None,
+                 subject=metric.label if page_spec.selector_label else None)
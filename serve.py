@@ -0,0 +1,21 @@
+"""Start the dashboard with its caches warming from the moment the server starts.
+
+    python serve.py [streamlit run options, e.g. --server.port 8501]
+
+Same as ``streamlit run pps_dsg_streamlit_20jun25.py``, except that loading
+the data and the default view (first page, latest year) begins in a
+background thread before the first reader connects (see pps_dsg/loaders.py).
+"""
+import os
+import sys
+
+from streamlit.web import cli
+
+from pps_dsg import loaders
+
+APP_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pps_dsg_streamlit_20jun25.py")
+
+if __name__ == "__main__":
+    loaders.start_warmup()
+    sys.argv = ["streamlit", "run", APP_SCRIPT] + sys.argv[1:]
+    sys.exit(cli.main())